@@ -0,0 +1,194 @@
+# ==================================================
+#
+# This file is part of CustomMaschineMK3.
+# CustomMaschineMK3 is free software licensed under GPL-3.0.
+# For more details, see "LICENSE" file.
+#
+# Copyright (C) 2024-2025 chiaki
+#
+# ==================================================
+
+from functools import lru_cache
+from ableton.v3.control_surface.components import (
+    PlayableComponent,
+    PitchProvider
+)
+from ableton.v3.control_surface.display import Renderable
+from ableton.v3.control_surface.controls import (
+    ButtonControl,
+    PlayableControl,
+    control_matrix
+)
+from ableton.v3.base import depends, listens
+
+from .Logger import logger
+from .LedColorCacheMixin import LedColorCacheMixin
+from .MaschinePlayableComponent import get_keyboard_layout, DEFAULT_NOTE_TRANSLATION_CHANNEL
+
+# Lowest chord is built on the scale root of this octave
+BASE_OCTAVE_NOTE = 48
+CHORD_TABLE_CACHE_SIZE = 64
+PAD_COUNT = 16
+MAX_INVERSION = 3
+NOTE_COUNT_OPTIONS = (3, 4, 5)
+DEFAULT_NOTE_COUNT = 3
+
+def make_chord_voicing(scale_notes, degree_index, note_count, inversion, spread):
+    # Stack every other scale note on top of the degree, same as stacking thirds in diatonic scales
+    notes = [scale_notes[degree_index + step * 2] for step in range(note_count) if degree_index + step * 2 < len(scale_notes)]
+    if len(notes) == 0:
+        return ()
+
+    for _ in range(inversion % len(notes)):
+        notes.append(notes.pop(0) + 12)
+
+    if spread and len(notes) >= 3:
+        # Open voicing, second note from the bottom moves up an octave
+        notes[1] += 12
+        notes.sort()
+
+    return tuple(note for note in notes if 0 <= note < 128)
+
+# Voicing of each pad, indexed from bottom left pad.
+# All chords are built at once when scale or voicing option is changed, pad presses only look up the table.
+@lru_cache(maxsize = CHORD_TABLE_CACHE_SIZE)
+def get_chord_table(root_note, intervals, pad_count, note_count, inversion, spread):
+    logger.debug(f"Create chord table root = {root_note}, intervals = {intervals}, notes = {note_count}, inversion = {inversion}, spread = {spread}")
+    layout = get_keyboard_layout(root_note, intervals, True)
+    first_index = layout.index_of(BASE_OCTAVE_NOTE + root_note)
+    return tuple(
+        make_chord_voicing(layout.scale_notes, first_index + pad_index, note_count, inversion, spread)
+        for pad_index in range(pad_count))
+
+class ChordPadsComponent(PlayableComponent, LedColorCacheMixin, PitchProvider, Renderable):
+    option_buttons = control_matrix(ButtonControl, color = None)
+
+    _target_track = None
+    _note_count = DEFAULT_NOTE_COUNT
+    _inversion = 0
+    _spread = False
+    _selected_index = 0
+    _chord_table = ()
+
+    @depends(target_track = None)
+    def __init__(self, name = "Chord_Pads", translation_channel = DEFAULT_NOTE_TRANSLATION_CHANNEL, matrix_always_listenable = True, target_track = None, *a, **k):
+        super().__init__(name = name, matrix_always_listenable = matrix_always_listenable, *a, **k)
+        self._translation_channel = translation_channel
+        self._target_track = target_track
+        self.register_slot(self.song, self._on_scale_changed, "root_note")
+        self.register_slot(self.song, self._on_scale_changed, "scale_intervals")
+        self._on_target_track_changed.subject = self._target_track
+        self._update_chord_table()
+
+    @property
+    def selected_chord(self):
+        if self._selected_index < len(self._chord_table):
+            return self._chord_table[self._selected_index]
+        return ()
+
+    def set_matrix(self, matrix):
+        super().set_matrix(matrix)
+        for button in self.matrix:
+            button.set_mode(PlayableControl.Mode.playable_and_listenable)
+
+    def set_option_buttons(self, matrix):
+        self.option_buttons.set_control_element(matrix)
+        self._update_led_feedback()
+
+    def _pad_index_for_button(self, button):
+        row, column = button.coordinate
+        return (self.height - row - 1) * self.width + column
+
+    def _on_matrix_pressed(self, button):
+        # Pad itself plays bass note of the chord through note translation,
+        # whole chord becomes pitches of step sequencer
+        self._selected_index = self._pad_index_for_button(button)
+        chord = self.selected_chord
+        if len(chord) > 0:
+            self.pitches = list(chord)
+        self._update_led_feedback()
+
+    def _on_matrix_released(self, button):
+        super()._on_matrix_released(button)
+        self._update_button_color(button)
+
+    @option_buttons.pressed
+    def _on_option_button_pressed(self, button):
+        row, column = button.coordinate
+        if row == 0:
+            self._inversion = min(column, MAX_INVERSION)
+        elif column < len(NOTE_COUNT_OPTIONS):
+            self._note_count = NOTE_COUNT_OPTIONS[column]
+        else:
+            self._spread = not self._spread
+
+        logger.info(f"Chord notes = {self._note_count}, inversion = {self._inversion}, spread = {self._spread}")
+        self._update_chord_table()
+        chord = self.selected_chord
+        if len(chord) > 0:
+            self.pitches = list(chord)
+
+    def _on_scale_changed(self):
+        self._update_chord_table()
+
+    def _update_chord_table(self):
+        table = get_chord_table(self.song.root_note, tuple(self.song.scale_intervals), PAD_COUNT, self._note_count, self._inversion, self._spread)
+        if table is not self._chord_table:
+            self._chord_table = table
+            self._update_note_translations()
+        self._update_led_feedback()
+
+    def _note_translation_for_button(self, button):
+        pad_index = self._pad_index_for_button(button)
+        chord = self._chord_table[pad_index] if pad_index < len(self._chord_table) else ()
+        if len(chord) > 0:
+            return (chord[0], self._translation_channel)
+        # Unused pad is moved to next channel, same as keyboard
+        return (pad_index, self._translation_channel + 1)
+
+    def _set_button_control_properties(self, button):
+        translation = self._note_translation_for_button(button)
+        if (button.identifier, button.channel) != translation:
+            button.identifier, button.channel = translation
+
+    def _update_button_color(self, button):
+        pad_index = self._pad_index_for_button(button)
+        if pad_index >= len(self._chord_table) or len(self._chord_table[pad_index]) == 0:
+            color_name = "Chord.NoChord"
+        elif pad_index == self._selected_index:
+            color_name = "Chord.Selected"
+        elif pad_index % len(self.song.scale_intervals) == 0:
+            color_name = "Chord.RootChord"
+        else:
+            color_name = "Chord.Chord"
+
+        self._validate_led_cache(self._target_track.target_track)
+        self._set_led_color(button, color_name, "Chord.Pressed")
+
+    def _update_led_feedback(self):
+        for button in self.matrix:
+            self._update_button_color(button)
+
+        for button in self.option_buttons:
+            row, column = button.coordinate
+            if row == 0:
+                is_on = column == self._inversion
+            elif column < len(NOTE_COUNT_OPTIONS):
+                is_on = NOTE_COUNT_OPTIONS[column] == self._note_count
+            else:
+                is_on = self._spread
+            button.color = "Chord.OptionOn" if is_on else "Chord.Option"
+
+    def update(self):
+        super().update()
+        self._update_led_feedback()
+
+    @listens("target_track")
+    def _on_target_track_changed(self):
+        self._on_track_color_changed.subject = self._target_track.target_track
+        self._update_led_feedback()
+
+    # "color" changes with color index too, so it covers both LED color mappings
+    @listens("color")
+    def _on_track_color_changed(self):
+        self._update_led_feedback()
@@ -8,6 +8,7 @@
 #
 # ==================================================
 
+from bisect import bisect_left, bisect_right
 from functools import partial
 from math import modf, ceil
 from ableton.v3.base import clamp, depends, listens, nop, sign, listenable_property, EventObject
@@ -34,6 +35,7 @@ from Live.Clip import ( # type: ignore
 )
 
 from .Logger import logger
+from .TransientAnalyzer import TransientAnalyzer
 
 class ClipLaunchQuantizationList():
     values = [
@@ -279,6 +281,43 @@ COARSE_TIME_RESOLUTION = 0.1
 FINE_TIME_RESOLUTION = 0.001
 COARSE_GAIN_RESOLUTION = 0.005
 FINE_GAIN_RESOLUTION = 0.001
+# Small margin for treating current position as "on" a transient
+TRANSIENT_SNAP_TOLERANCE = 0.0005
+
+NO_WARP_MARKER = "---"
+WARP_MARKER_COARSE_STEP = 0.25
+WARP_MARKER_FINE_STEP = 1 / 128.0
+
+class WarpMarkerIndex:
+    # Sorted snapshot of clip.warp_markers.
+    # Rebuilt only when markers are changed, lookups from encoders use bisect.
+    def __init__(self):
+        self._beat_times = ()
+        self._sample_times = ()
+        self._valid = False
+
+    def invalidate(self):
+        self._valid = False
+
+    def update(self, clip):
+        if not self._valid:
+            markers = sorted(clip.warp_markers, key = lambda marker: marker.beat_time) if liveobj_valid(clip) else []
+            self._beat_times = tuple(marker.beat_time for marker in markers)
+            self._sample_times = tuple(marker.sample_time for marker in markers)
+            self._valid = True
+
+    def __len__(self):
+        return len(self._beat_times)
+
+    def beat_time(self, index):
+        return self._beat_times[index]
+
+    def sample_time(self, index):
+        return self._sample_times[index]
+
+    def index_of(self, beat_time):
+        # Index of nearest marker at or before beat_time
+        return clamp(bisect_right(self._beat_times, beat_time) - 1, 0, len(self._beat_times) - 1)
 
 class EncoderCallbackSet:
     value_changed = None
@@ -300,6 +339,7 @@ class ClipEditorComponent(Component, Renderable):
     launch_quantize_button = MappedButtonControl(color = "DefaultButton.Off", on_color = "DefaultButton.Off", pressed_color = "DefaultButton.On")
     legato_button = MappedButtonControl(color = "DefaultButton.Off", on_color = "DefaultButton.On")
     warp_button = MappedButtonControl(color = "DefaultButton.Off", on_color = "DefaultButton.On")
+    warp_marker_button = ButtonControl(color = "DefaultButton.Off", on_color = "DefaultButton.On")
 
     fine_grain_button = ButtonControl(color = None)
     control_encoders = control_list(EncoderControl, control_count = bank_size)
@@ -312,6 +352,9 @@ class ClipEditorComponent(Component, Renderable):
     _pitch_value_stepper = CustomValueStepper(16)
     _warp_mode_value_stepper = CustomValueStepper(4)
     _gain_value_stepper = CustomValueStepper(64)
+    _warp_marker_select_value_stepper = CustomValueStepper(16)
+    _warp_marker_move_value_stepper = CustomValueStepper(32)
+    _warp_marker_edit_value_stepper = CustomValueStepper(4)
 
     _nudge_offset_value_stepper = CustomValueStepper(32)
     _note_length_value_stepper = CustomValueStepper(32)
@@ -322,14 +365,20 @@ class ClipEditorComponent(Component, Renderable):
     _target_track = None
     _clip = None
     _step_sequence = None
+    _settings = None
+    _transient_analyzer = None
+    _warp_marker_page = False
+    _selected_warp_marker_time = None
 
     _empty_encoder_callbacks = [EncoderCallbackSet()] * bank_size
     _encoder_callbacks = _empty_encoder_callbacks
 
-    @depends(target_track = None)
-    def __init__(self, name = "Clip_Editor", target_track = None, *a, **k):
+    @depends(target_track = None, settings = None)
+    def __init__(self, name = "Clip_Editor", target_track = None, settings = None, *a, **k):
         super().__init__(name, *a, **k)
         self._target_track = target_track
+        self._settings = settings
+        self._transient_analyzer = TransientAnalyzer()
         self._looped_audio_clip_encoder_callbacks = [
             EncoderCallbackSet(self._change_position),
             EncoderCallbackSet(self._change_loop_end),
@@ -363,6 +412,17 @@ class ClipEditorComponent(Component, Renderable):
             EncoderCallbackSet(self._change_note_velocity),
         ]
 
+        self._warp_marker_encoder_callbacks = [
+            EncoderCallbackSet(self._change_selected_warp_marker),
+            EncoderCallbackSet(self._move_warp_marker),
+            EncoderCallbackSet(self._insert_or_remove_warp_marker),
+            EncoderCallbackSet(),
+            EncoderCallbackSet(self._change_gain),
+            EncoderCallbackSet(self._change_pitch),
+            EncoderCallbackSet(self._change_warp_mode),
+            EncoderCallbackSet(),
+        ]
+
         self._nonlooped_midi_clip_encoder_callbacks = [
             EncoderCallbackSet(self._change_loop_start),
             EncoderCallbackSet(self._change_loop_end),
@@ -381,6 +441,7 @@ class ClipEditorComponent(Component, Renderable):
         self._legato_parameter = BoolWrappingParameter(None, "legato", bool_on_off)
         self._warp_parameter = BoolWrappingParameter(None, "warping", bool_on_off)
         self._warp_mode_parameter = CustomEnumWrappingParameter(None, None, "available_warp_modes", "warp_mode", int, self._to_warp_mode, self._from_warp_mode)
+        self._warp_marker_index = WarpMarkerIndex()
 
         self.mute_button.mapped_parameter = self._mute_parameter
         self.loop_button.mapped_parameter = self._loop_parameter
@@ -445,6 +506,34 @@ class ClipEditorComponent(Component, Renderable):
         else:
             return ""
     
+    @listenable_property
+    def warp_marker_page(self):
+        return self._warp_marker_page and self._is_warp_marker_editable()
+
+    @listenable_property
+    def warp_marker_position(self):
+        index = self._selected_warp_marker_index()
+        if index != None:
+            return f"{index + 1}/{len(self._warp_marker_index)}"
+        else:
+            return NO_WARP_MARKER
+
+    @listenable_property
+    def warp_marker_beat_time(self):
+        index = self._selected_warp_marker_index()
+        if index != None:
+            return self._to_bars_string(self._warp_marker_index.beat_time(index), self._clip.signature_numerator, self._clip.signature_denominator, True)
+        else:
+            return NO_WARP_MARKER
+
+    @listenable_property
+    def warp_marker_sample_time(self):
+        index = self._selected_warp_marker_index()
+        if index != None:
+            return self._to_time_string(self._warp_marker_index.sample_time(index))
+        else:
+            return NO_WARP_MARKER
+
     def _to_warp_mode(self, value):
         return self._clip.available_warp_modes[value]
 
@@ -492,6 +581,15 @@ class ClipEditorComponent(Component, Renderable):
     def set_step_sequence(self, step_sequence):
         self._step_sequence = step_sequence
 
+    def disconnect(self):
+        self._transient_analyzer.stop()
+        super().disconnect()
+
+    @warp_marker_button.pressed
+    def _on_warp_marker_button_pressed(self, button):
+        self._warp_marker_page = not self._warp_marker_page
+        self._map_clip_encoder_parameters()
+
     @crop_button.pressed
     def _on_crop_button_pressed(self, button):
         if liveobj_valid(self._clip):
@@ -541,13 +639,23 @@ class ClipEditorComponent(Component, Renderable):
         self._on_clip_denominator_changed.subject = self._clip
         if liveobj_valid(self._clip) and self._clip.is_audio_clip:
             self._on_clip_warping_changed.subject = self._clip
+            self._on_clip_warp_markers_changed.subject = self._clip
+            self._on_clip_file_path_changed.subject = self._clip
+            # File may be re-rendered while other clip is selected
+            self._transient_analyzer.invalidate(self._clip.file_path)
         else:
             self._on_clip_warping_changed.subject = None
+            self._on_clip_warp_markers_changed.subject = None
+            self._on_clip_file_path_changed.subject = None
+        self._selected_warp_marker_time = None
+        self._warp_marker_index.invalidate()
+        self._notify_warp_marker()
         self.notify_loop_length()
         self.notify_loop_offset()
         self.notify_start_marker()
         self.notify_loop_start()
         self.notify_loop_end()
+        self._prepare_transients()
 
     @listens("looping")
     def _on_clip_looping_changed(self):
@@ -591,6 +699,71 @@ class ClipEditorComponent(Component, Renderable):
         self.notify_loop_length()
         self.notify_loop_offset()
         self.notify_start_marker()
+        self._prepare_transients()
+        self._map_clip_encoder_parameters()
+
+    @listens("file_path")
+    def _on_clip_file_path_changed(self):
+        self._transient_analyzer.invalidate(self._clip.file_path)
+        self._prepare_transients()
+
+    @listens("warp_markers")
+    def _on_clip_warp_markers_changed(self):
+        self._warp_marker_index.invalidate()
+        self._notify_warp_marker()
+
+    def _notify_warp_marker(self):
+        self.notify_warp_marker_position()
+        self.notify_warp_marker_beat_time()
+        self.notify_warp_marker_sample_time()
+
+    def _is_warp_marker_editable(self):
+        return liveobj_valid(self._clip) and self._clip.is_audio_clip and self._clip.warping
+
+    def _selected_warp_marker_index(self):
+        if not self._is_warp_marker_editable():
+            return None
+
+        self._warp_marker_index.update(self._clip)
+        if len(self._warp_marker_index) == 0:
+            return None
+
+        if self._selected_warp_marker_time == None:
+            self._selected_warp_marker_time = self._warp_marker_index.beat_time(0)
+
+        return self._warp_marker_index.index_of(self._selected_warp_marker_time)
+
+    def _is_transient_snap_enabled(self):
+        return (self._settings != None
+            and self._settings.get_value("transient_snap")
+            and liveobj_valid(self._clip)
+            and self._clip.is_audio_clip
+            and not self._clip.warping)
+
+    def _prepare_transients(self):
+        # Start analysis early, so onsets are ready before encoder is turned
+        if self._is_transient_snap_enabled():
+            self._transient_analyzer.onsets_for(self._clip.file_path)
+
+    def _snap_to_transient(self, current_time, step):
+        # Returns time of transient "step" onsets away from current time,
+        # or None if snapping is not available (disabled, fine grain or analysis not finished yet)
+        if self.fine_grain_button.is_pressed or not self._is_transient_snap_enabled():
+            return None
+
+        onsets = self._transient_analyzer.onsets_for(self._clip.file_path)
+        if not onsets:
+            return None
+
+        if step > 0:
+            index = bisect_right(onsets, current_time + TRANSIENT_SNAP_TOLERANCE) + step - 1
+        else:
+            index = bisect_left(onsets, current_time - TRANSIENT_SNAP_TOLERANCE) + step
+
+        # No onset left in turning direction, fixed step is used instead of jumping backwards
+        if index < 0 or index >= len(onsets):
+            return None
+        return onsets[index]
 
     def _map_clip_button_parameters(self):
         if liveobj_valid(self._clip):
@@ -616,9 +789,13 @@ class ClipEditorComponent(Component, Renderable):
             self._warp_mode_parameter.set_values_host(None)
     
     def _map_clip_encoder_parameters(self):
+        self.warp_marker_button.is_on = self._warp_marker_page
+        self.notify_warp_marker_page()
         if liveobj_valid(self._clip):
             if self._clip.is_audio_clip:
-                if self._clip.looping:
+                if self._warp_marker_page and self._clip.warping:
+                    self._encoder_callbacks = self._warp_marker_encoder_callbacks
+                elif self._clip.looping:
                     self._encoder_callbacks = self._looped_audio_clip_encoder_callbacks
                 else:
                     self._encoder_callbacks = self._nonlooped_audio_clip_encoder_callbacks
@@ -648,7 +825,12 @@ class ClipEditorComponent(Component, Renderable):
             if self._clip.is_midi_clip or self._clip.warping:
                 self._clip.loop_start += step * (self._get_one_beat_length() if use_fine_grain else self._get_one_bar_length())
             else:
-                self._clip.loop_start += step * (FINE_TIME_RESOLUTION if use_fine_grain else COARSE_TIME_RESOLUTION)
+                snapped_time = self._snap_to_transient(self._clip.loop_start, step)
+                if snapped_time != None:
+                    if snapped_time < self._clip.loop_end:
+                        self._clip.loop_start = snapped_time
+                else:
+                    self._clip.loop_start += step * (FINE_TIME_RESOLUTION if use_fine_grain else COARSE_TIME_RESOLUTION)
             
             self._clip.view.show_loop()
 
@@ -659,7 +841,9 @@ class ClipEditorComponent(Component, Renderable):
             if self._clip.is_midi_clip or self._clip.warping:
                 new_loop_end = self._clip.loop_end + step * (self._get_one_beat_length() if use_fine_grain else self._get_one_bar_length())
             else:
-                new_loop_end = self._clip.loop_end + step * (FINE_TIME_RESOLUTION if use_fine_grain else COARSE_TIME_RESOLUTION)
+                new_loop_end = self._snap_to_transient(self._clip.loop_end, step)
+                if new_loop_end == None:
+                    new_loop_end = self._clip.loop_end + step * (FINE_TIME_RESOLUTION if use_fine_grain else COARSE_TIME_RESOLUTION)
 
             if new_loop_end > self._clip.loop_start:
                 self._clip.loop_end = new_loop_end
@@ -680,7 +864,11 @@ class ClipEditorComponent(Component, Renderable):
             if self._clip.is_midi_clip or self._clip.warping:
                 self._clip.start_marker += step * (self._get_one_beat_length() if use_fine_grain else self._get_one_bar_length())
             else:
-                self._clip.start_marker += step * (FINE_TIME_RESOLUTION if use_fine_grain else COARSE_TIME_RESOLUTION)
+                snapped_time = self._snap_to_transient(self._clip.start_marker, step)
+                if snapped_time != None:
+                    self._clip.start_marker = snapped_time
+                else:
+                    self._clip.start_marker += step * (FINE_TIME_RESOLUTION if use_fine_grain else COARSE_TIME_RESOLUTION)
 
     def _change_launch_quantization(self, value, encoder):
         step = self._launch_quantization_value_stepper.update(value)
@@ -713,6 +901,53 @@ class ClipEditorComponent(Component, Renderable):
             new_value = self._clip.gain + step * (FINE_GAIN_RESOLUTION if use_fine_grain else COARSE_GAIN_RESOLUTION)
             self._clip.gain = clamp(new_value, 0.0, 1.0)
 
+    def _change_selected_warp_marker(self, value, encoder):
+        step = self._warp_marker_select_value_stepper.update(value)
+        index = self._selected_warp_marker_index()
+        if step != 0 and index != None:
+            index = clamp(index + step, 0, len(self._warp_marker_index) - 1)
+            self._selected_warp_marker_time = self._warp_marker_index.beat_time(index)
+            self._notify_warp_marker()
+
+    def _move_warp_marker(self, value, encoder):
+        step = self._warp_marker_move_value_stepper.update(value)
+        index = self._selected_warp_marker_index()
+        if step != 0 and index != None:
+            beat_time = self._warp_marker_index.beat_time(index)
+            distance = step * (WARP_MARKER_FINE_STEP if self.fine_grain_button.is_pressed else WARP_MARKER_COARSE_STEP)
+
+            # Markers can't pass over neighbours
+            if index > 0:
+                distance = max(distance, self._warp_marker_index.beat_time(index - 1) - beat_time + WARP_MARKER_FINE_STEP)
+            if index < len(self._warp_marker_index) - 1:
+                distance = min(distance, self._warp_marker_index.beat_time(index + 1) - beat_time - WARP_MARKER_FINE_STEP)
+
+            # Neighbour closer than the gap reverses the clamped distance, marker stays instead of moving backwards
+            if distance * step > 0.0:
+                self._clip.move_warp_marker(beat_time, distance)
+                self._selected_warp_marker_time = beat_time + distance
+
+    def _insert_or_remove_warp_marker(self, value, encoder):
+        # Turn right to insert marker between selected and next one, turn left to remove selected one
+        step = self._warp_marker_edit_value_stepper.update(value)
+        index = self._selected_warp_marker_index()
+        if step == 0 or index == None:
+            return
+
+        marker_index = self._warp_marker_index
+        if step > 0 and index < len(marker_index) - 1:
+            beat_time = (marker_index.beat_time(index) + marker_index.beat_time(index + 1)) / 2
+            sample_time = (marker_index.sample_time(index) + marker_index.sample_time(index + 1)) / 2
+            try:
+                self._clip.add_warp_marker(WarpMarker(beat_time = beat_time, sample_time = sample_time))
+                self._selected_warp_marker_time = beat_time
+            except RuntimeError as ex:
+                logger.warning(f"Failed to insert warp marker: {ex}")
+        elif step < 0 and len(marker_index) > 1:
+            beat_time = marker_index.beat_time(index)
+            self._clip.remove_warp_marker(beat_time)
+            self._selected_warp_marker_time = marker_index.beat_time(max(index - 1, 0))
+
     def _change_note_nudge_offset(self, value, encoder):
         step = self._nudge_offset_value_stepper.update(value)
         if step != 0 and self._step_sequence != None:
@@ -13,35 +13,153 @@ from ableton.v3.control_surface.controls import (
     ButtonControl,
     control_matrix
 )
-from ableton.v3.base import depends
+from ableton.v3.base import depends, listens, EventObject
+from ableton.v3.live import liveobj_changed, liveobj_valid
 
 from .Logger import logger
 
+# Shared cache of notes in sequencer clip
+# Querying notes from Live on every pad press is slow while selecting notes across many pads,
+# so this object reads all notes at once and keeps note IDs grouped by pitch.
+# Index is rebuilt lazily, clip note changes only mark it dirty and send "notes_changed" event.
+# Notes are read again when index is queried, or when validate() is called by a visible consumer,
+# so nothing is scanned while no consumer needs notes.
+# Difference from previous state is sent via "note_diff" event when index is rebuilt.
+# Listeners receive lists of added and removed (pitch, start_time) tuples and reset flag,
+# reset flag is True when the whole clip is replaced and listeners have to clear their state.
+class ClipNoteIndex(EventObject):
+    __events__ = ("note_diff", "notes_changed")
+
+    def __init__(self, sequencer_clip = None, *a, **k):
+        super().__init__(*a, **k)
+        self._sequencer_clip = sequencer_clip
+        self._clip = None
+        self._is_dirty = False
+        self._notes_by_id = {}
+        self._note_ids_by_pitch = {}
+        self._on_clip_changed.subject = self._sequencer_clip
+        self._on_clip_changed()
+
+    @property
+    def clip(self):
+        return self._clip
+
+    @property
+    def note_positions(self):
+        self.validate()
+        return self._notes_by_id.values()
+
+    def note_ids_for_pitch(self, pitch):
+        self.validate()
+        return tuple(self._note_ids_by_pitch.get(pitch, ()))
+
+    def validate(self):
+        if self._is_dirty:
+            self._update()
+
+    def _read_notes(self):
+        notes_by_id = {}
+        if liveobj_valid(self._clip):
+            notes = self._clip.get_notes_extended(
+                from_time = 0,
+                from_pitch = 0,
+                time_span = self._clip.length,
+                pitch_span = 128)
+
+            for note in notes:
+                notes_by_id[note.note_id] = (note.pitch, note.start_time)
+
+        return notes_by_id
+
+    def _add_to_pitch_index(self, note_id, pitch):
+        self._note_ids_by_pitch.setdefault(pitch, set()).add(note_id)
+
+    def _remove_from_pitch_index(self, note_id, pitch):
+        note_ids = self._note_ids_by_pitch.get(pitch)
+        if note_ids != None:
+            note_ids.discard(note_id)
+
+    def _reset(self):
+        self._is_dirty = False
+        self._notes_by_id = self._read_notes()
+        self._note_ids_by_pitch = {}
+        for note_id, (pitch, _) in self._notes_by_id.items():
+            self._add_to_pitch_index(note_id, pitch)
+        logger.debug(f"Reset clip note index notes = {len(self._notes_by_id)}")
+        self.notify_note_diff(list(self._notes_by_id.values()), [], True)
+
+    def _update(self):
+        # Clear dirty flag first, listeners of "note_diff" may query index again
+        self._is_dirty = False
+        old_notes = self._notes_by_id
+        new_notes = self._read_notes()
+        added = []
+        removed = []
+
+        for note_id, position in new_notes.items():
+            old_position = old_notes.get(note_id)
+            if old_position != position:
+                added.append(position)
+                self._add_to_pitch_index(note_id, position[0])
+                if old_position != None:
+                    removed.append(old_position)
+                    if old_position[0] != position[0]:
+                        self._remove_from_pitch_index(note_id, old_position[0])
+
+        for note_id, position in old_notes.items():
+            if note_id not in new_notes:
+                removed.append(position)
+                self._remove_from_pitch_index(note_id, position[0])
+
+        self._notes_by_id = new_notes
+        if len(added) > 0 or len(removed) > 0:
+            logger.debug(f"Update clip note index added = {len(added)}, removed = {len(removed)}")
+            self.notify_note_diff(added, removed, False)
+
+    @listens("clip")
+    def _on_clip_changed(self):
+        clip = self._sequencer_clip.clip if self._sequencer_clip != None else None
+        self._clip = clip if liveobj_valid(clip) and clip.is_midi_clip else None
+        self._on_notes_changed.subject = self._clip
+        self._reset()
+
+    @listens("notes")
+    def _on_notes_changed(self):
+        self._is_dirty = True
+        self.notify_notes_changed()
+
 class ClipNotesSelectMixin():
     select_note_button = ButtonControl(color = None)
     erase_note_button = ButtonControl(color = None)
 
     _sequencer_clip = None
+    _clip_note_index = None
+    _selected_clip = None
     _trigger_deselect = True
 
-    @depends(sequencer_clip = None)
-    def __init__(self, sequencer_clip = None, *a, **k):
+    @depends(sequencer_clip = None, clip_note_index = None)
+    def __init__(self, sequencer_clip = None, clip_note_index = None, *a, **k):
         super().__init__(*a, **k)
         self._sequencer_clip = sequencer_clip
+        self._clip_note_index = clip_note_index
 
     def select_notes(self, pitch):
         clip = self._sequencer_clip.clip
         if clip != None:
-            notes = clip.get_notes_extended(
-                from_time = 0,
-                from_pitch = pitch,
-                time_span = clip.length,
-                pitch_span = 1)
-            
-            note_ids = [note.note_id for note in notes]
-            if self._trigger_deselect:
+            if self._clip_note_index != None and not liveobj_changed(self._clip_note_index.clip, clip):
+                note_ids = self._clip_note_index.note_ids_for_pitch(pitch)
+            else:
+                notes = clip.get_notes_extended(
+                    from_time = 0,
+                    from_pitch = pitch,
+                    time_span = clip.length,
+                    pitch_span = 1)
+                note_ids = [note.note_id for note in notes]
+
+            if self._trigger_deselect or liveobj_changed(self._selected_clip, clip):
                 clip.deselect_all_notes()
                 self._trigger_deselect = False
+            self._selected_clip = clip
             clip.select_notes_by_id(note_ids)
 
     @select_note_button.value
@@ -60,8 +178,9 @@ class ClipNotesSelectMixin():
     def _on_note_erase_button_pressed(self, button):
         clip = self._sequencer_clip.clip
         if clip != None:
-            selected_notes = clip.get_selected_notes_extended()
-            clip.remove_notes_by_id([note.note_id for note in selected_notes])
+            # Selection may be changed in Live after selecting from pads, so current selection is always read from clip
+            note_ids = [note.note_id for note in clip.get_selected_notes_extended()]
+            clip.remove_notes_by_id(note_ids)
 
     def _set_control_pads_from_script(self, takeover_pads):
         super()._set_control_pads_from_script(takeover_pads or self.select_note_button.is_pressed)
@@ -0,0 +1,168 @@
+# ==================================================
+#
+# This file is part of CustomMaschineMK3.
+# CustomMaschineMK3 is free software licensed under GPL-3.0.
+# For more details, see "LICENSE" file.
+#
+# Copyright (C) 2024-2025 chiaki
+#
+# ==================================================
+
+from math import ceil
+from ableton.v3.control_surface.component import Component
+from ableton.v3.control_surface.controls import ButtonControl, control_matrix
+from ableton.v3.base import depends, listens
+from ableton.v3.live import liveobj_changed, liveobj_valid
+
+from .Logger import logger
+from .PadUtils import step_index_for_button
+
+REGION_COUNT = 16
+DENSITY_LEVELS = 4
+
+# Note count histogram of fixed size regions.
+# Counts are updated from note differences, full rebuild happens only when clip or region size changes.
+class RegionHistogram:
+    def __init__(self, region_count = REGION_COUNT):
+        self._region_count = region_count
+        self._region_length = 0.0
+        self._counts = [0] * region_count
+        self._max_count = 0
+
+    @property
+    def region_length(self):
+        return self._region_length
+
+    @property
+    def max_count(self):
+        return self._max_count
+
+    def count(self, region):
+        return self._counts[region]
+
+    def region_of(self, time):
+        if self._region_length <= 0.0:
+            return -1
+        region = int(time // self._region_length)
+        return region if 0 <= region < self._region_count else -1
+
+    def reset(self, positions, region_length):
+        self._region_length = region_length
+        self._counts = [0] * self._region_count
+        self._max_count = 0
+        self.apply(positions, [])
+
+    def apply(self, added, removed):
+        counts = self._counts
+        for _, start_time in added:
+            region = self.region_of(start_time)
+            if region != -1:
+                counts[region] += 1
+
+        for _, start_time in removed:
+            region = self.region_of(start_time)
+            if region != -1 and counts[region] > 0:
+                counts[region] -= 1
+
+        self._max_count = max(counts)
+
+    def density_level(self, region):
+        # 0 is empty, otherwise 1 to DENSITY_LEVELS relative to densest region
+        count = self._counts[region]
+        if count == 0 or self._max_count == 0:
+            return 0
+        return max(1, ceil(count * DENSITY_LEVELS / self._max_count))
+
+class ClipOverviewComponent(Component):
+    region_buttons = control_matrix(ButtonControl, color = None)
+
+    _clip_note_index = None
+    _step_sequence = None
+    _settings = None
+    _clip = None
+
+    @depends(clip_note_index = None, settings = None)
+    def __init__(self, name = "Clip_Overview", clip_note_index = None, settings = None, *a, **k):
+        super().__init__(name, *a, **k)
+        self._clip_note_index = clip_note_index
+        self._settings = settings
+        self._histogram = RegionHistogram()
+        self._on_note_diff.subject = self._clip_note_index
+        self._on_clip_notes_changed.subject = self._clip_note_index
+        self._set_clip(self._clip_note_index.clip if self._clip_note_index != None else None)
+
+    def set_step_sequence(self, step_sequence):
+        self._step_sequence = step_sequence
+
+    def set_region_buttons(self, matrix):
+        self.region_buttons.set_control_element(matrix)
+        self._update_led_feedback()
+
+    @region_buttons.pressed
+    def _on_region_button_pressed(self, button):
+        region = step_index_for_button(button, self.region_buttons, self._settings)
+        if self._step_sequence != None and region < REGION_COUNT and self._histogram.region_length > 0.0:
+            time = self._clip.loop_start + region * self._histogram.region_length
+            if time < self._clip.loop_end:
+                logger.info(f"Jump to clip region {region}, time = {time}")
+                self._step_sequence.loop_selector.show_time(time)
+
+    @listens("notes_changed")
+    def _on_clip_notes_changed(self):
+        # Note index is read again only while overview is visible
+        if self.is_enabled():
+            self._clip_note_index.validate()
+
+    @listens("note_diff")
+    def _on_note_diff(self, added, removed, reset):
+        if reset or liveobj_changed(self._clip, self._clip_note_index.clip):
+            self._set_clip(self._clip_note_index.clip)
+        else:
+            self._histogram.apply(self._to_loop_positions(added), self._to_loop_positions(removed))
+            self._update_led_feedback()
+
+    @listens("loop_start")
+    def _on_loop_start_changed(self):
+        self._rebuild()
+
+    @listens("loop_end")
+    def _on_loop_end_changed(self):
+        self._rebuild()
+
+    def _set_clip(self, clip):
+        self._clip = clip if liveobj_valid(clip) else None
+        self._on_loop_start_changed.subject = self._clip
+        self._on_loop_end_changed.subject = self._clip
+        self._rebuild()
+
+    def _to_loop_positions(self, positions):
+        loop_start = self._clip.loop_start
+        return [(pitch, start_time - loop_start) for pitch, start_time in positions]
+
+    def _rebuild(self):
+        if self._clip != None:
+            # Each region covers whole bars, so pads line up with loop selector pages
+            bar_length = self._clip.signature_numerator * (4.0 / self._clip.signature_denominator)
+            loop_length = self._clip.loop_end - self._clip.loop_start
+            bars_per_region = max(1, ceil(ceil(loop_length / bar_length) / REGION_COUNT))
+            self._histogram.reset(self._to_loop_positions(self._clip_note_index.note_positions), bars_per_region * bar_length)
+        else:
+            self._histogram.reset([], 0.0)
+        self._update_led_feedback()
+
+    def _update_led_feedback(self):
+        region_length = self._histogram.region_length
+        loop_length = self._clip.loop_end - self._clip.loop_start if self._clip != None else 0.0
+        for button in self.region_buttons:
+            region = step_index_for_button(button, self.region_buttons, self._settings)
+            if region >= REGION_COUNT or region_length <= 0.0 or region * region_length >= loop_length:
+                button.color = "ClipOverview.NoRegion"
+            else:
+                button.color = f"ClipOverview.Density{self._histogram.density_level(region)}"
+
+    def update(self):
+        # Notes changed while hidden are applied before drawing
+        if self._clip_note_index != None:
+            self._clip_note_index.validate()
+        super().update()
+        self._update_led_feedback()
@@ -8,11 +8,17 @@
 #
 # ==================================================
 
+import json
 from functools import partial
+from hashlib import sha256
+from operator import add
+from pathlib import Path
 from ableton.v3.control_surface.skin import Skin, BasicColors
 from ableton.v3.control_surface.elements import SimpleColor, RgbColor, create_rgb_color
 from ableton.v3.live.util import liveobj_valid
 
+from .Logger import logger
+
 
 # Rules of color space use
 #
@@ -174,34 +180,235 @@ LIVE_COLOR_MAP = {
     69: (WHITE, LEVEL_1)
 }
 
+LIVE_COLOR_COUNT = 70
+LEVELS = (LEVEL_1, LEVEL_2, LEVEL_3, LEVEL_4)
+PALETTE_SIZE = 128
+NO_COLOR_INDEX_COLOR = make_color(WHITE, LEVEL_3)
+
+def to_palette_index(base, level):
+    return 4 * base + level
+
+# Maschine palette index of each Live color index
+LIVE_COLOR_PALETTE_INDICES = tuple(to_palette_index(*LIVE_COLOR_MAP.get(index, (BLACK, LEVEL_1))) for index in range(LIVE_COLOR_COUNT))
+
+# All color variants of Maschine palette are built once at import time.
+# Skin functions below only pick an entry by palette index, no color object is created on LED updates.
+def make_palette_color_table(conversion):
+    return tuple(conversion(index // 4, index % 4) for index in range(PALETTE_SIZE))
+
+ELEMENT_COLORS = make_palette_color_table(make_color)
+KEYBOARD_COLORS = make_palette_color_table(lambda base, brightness: make_color(base, LEVEL_1 if brightness < LEVEL_4 else LEVEL_4))
+KEYBOARD_ACCENT_COLORS = make_palette_color_table(lambda base, brightness: make_color(base, LEVEL_3 if brightness < LEVEL_4 else LEVEL_2))
+KEYBOARD_GROUP_COLORS = make_palette_color_table(lambda base, brightness: make_color(base, LEVEL_2 if brightness < LEVEL_4 else LEVEL_4))
+# VELOCITY_COLORS[level][palette_index]
+VELOCITY_COLORS = tuple(make_palette_color_table(lambda base, brightness, level = level: make_color(base, level)) for level in LEVELS)
+
+# RGB color mapping
+# Live's color_index only tells nearest color of Live's palette, so RGB value can be used instead.
+# RGB is quantized into LUT_RESOLUTION^3 cells, each cell has nearest Maschine palette index.
+# LUT is built from palette file (or default palette) and cached on disk.
+PALETTE_FILE_NAME = "palette.json"
+LUT_FILE_NAME = "palette_lut.bin"
+LUT_RESOLUTION = 32
+LUT_SHIFT = 3
+
+DEFAULT_PALETTE = {
+    "levels": [0.2, 0.4, 0.7, 1.0],
+    "colors": {
+        "RED": [255, 0, 0],
+        "ORANGE": [255, 64, 0],
+        "LIGHT_ORANGE": [255, 128, 0],
+        "WARM_YELLOW": [255, 192, 0],
+        "YELLOW": [255, 255, 0],
+        "LIME": [128, 255, 0],
+        "GREEN": [0, 255, 0],
+        "MINT": [0, 255, 128],
+        "CYAN": [0, 255, 255],
+        "TURQUOISE": [0, 160, 255],
+        "BLUE": [0, 0, 255],
+        "PLUM": [96, 0, 255],
+        "VIOLET": [160, 0, 255],
+        "PURPLE": [200, 0, 255],
+        "MAGENTA": [255, 0, 255],
+        "FUCHSIA": [255, 0, 128],
+        "WHITE": [255, 255, 255],
+    }
+}
+
+BASE_COLOR_NAMES = {
+    "RED": RED, "ORANGE": ORANGE, "LIGHT_ORANGE": LIGHT_ORANGE, "WARM_YELLOW": WARM_YELLOW,
+    "YELLOW": YELLOW, "LIME": LIME, "GREEN": GREEN, "MINT": MINT,
+    "CYAN": CYAN, "TURQUOISE": TURQUOISE, "BLUE": BLUE, "PLUM": PLUM,
+    "VIOLET": VIOLET, "PURPLE": PURPLE, "MAGENTA": MAGENTA, "FUCHSIA": FUCHSIA,
+    "WHITE": WHITE,
+}
+
+class RgbPaletteLut:
+    def __init__(self, directory = Path(__file__).absolute().parent):
+        self._palette_path = directory.joinpath(PALETTE_FILE_NAME)
+        self._lut_path = directory.joinpath(LUT_FILE_NAME)
+        self._lut = None
+
+    def lookup(self, rgb):
+        # Returns Maschine palette index of 24bit RGB color
+        if self._lut == None:
+            self._lut = self._load()
+        return self._lut[((rgb >> 16 & 0xFF) >> LUT_SHIFT) * LUT_RESOLUTION * LUT_RESOLUTION
+            + ((rgb >> 8 & 0xFF) >> LUT_SHIFT) * LUT_RESOLUTION
+            + ((rgb & 0xFF) >> LUT_SHIFT)]
+
+    def _read_palette(self):
+        palette = DEFAULT_PALETTE
+        if self._palette_path.exists():
+            try:
+                user_palette = json.loads(self._palette_path.read_text())
+                palette = {
+                    "levels": user_palette.get("levels", DEFAULT_PALETTE["levels"]),
+                    "colors": dict(DEFAULT_PALETTE["colors"], **user_palette.get("colors", {})),
+                }
+            except (OSError, ValueError, AttributeError) as ex:
+                logger.warning(f"Failed to read {PALETTE_FILE_NAME}, default palette is used: {ex}")
+
+        # Very dark colors turn LED off
+        entries = [(to_palette_index(BLACK, LEVEL_1), (0, 0, 0))]
+        for name, rgb in palette["colors"].items():
+            if name in BASE_COLOR_NAMES and len(rgb) == 3:
+                for level, scale in zip(LEVELS, palette["levels"]):
+                    entries.append((to_palette_index(BASE_COLOR_NAMES[name], level), tuple(int(value * scale) for value in rgb)))
+        return entries
+
+    def _load(self):
+        entries = self._read_palette()
+        digest = sha256(repr(entries).encode()).digest()
+        try:
+            data = self._lut_path.read_bytes()
+            if data[:len(digest)] == digest and len(data) == len(digest) + LUT_RESOLUTION ** 3:
+                return data[len(digest):]
+        except OSError:
+            pass
+
+        logger.info(f"Build RGB palette LUT, palette entries = {len(entries)}")
+        lut = build_palette_lut(entries)
+        try:
+            self._lut_path.write_bytes(digest + lut)
+        except OSError as ex:
+            logger.warning(f"Failed to save RGB palette LUT: {ex}")
+        return lut
+
+def build_palette_lut(entries):
+    # Nearest palette entry for center of each cell, distance sums are done with map() to keep this fast
+    indices = [index for index, _ in entries]
+    cell_values = [(cell << LUT_SHIFT) + (1 << LUT_SHIFT) // 2 for cell in range(LUT_RESOLUTION)]
+    distances = [[[(value - rgb[channel]) ** 2 for _, rgb in entries] for value in cell_values] for channel in range(3)]
+    red_distances, green_distances, blue_distances = distances
+
+    lut = bytearray()
+    for red in red_distances:
+        for green in green_distances:
+            red_green = list(map(add, red, green))
+            for blue in blue_distances:
+                lut.append(min(zip(map(add, red_green, blue), indices))[1])
+    return bytes(lut)
+
+RGB_PALETTE_LUT = RgbPaletteLut()
+_use_rgb_color = False
+
+def set_rgb_color_mapping(enabled):
+    global _use_rgb_color
+    _use_rgb_color = enabled
+    for cache in ELEMENT_COLOR_CACHES:
+        cache.clear()
+
+def element_color_key(element):
+    # Value that decides LED color of element in current color mapping
+    if _use_rgb_color:
+        rgb = getattr(element, "color", None)
+        if rgb != None:
+            return rgb
+    # Negative keys for color index, so they never collide with RGB values
+    color_index = element.color_index
+    return -1 - color_index if color_index != None else None
+
+def palette_index_for_element(element):
+    # Returns None if element has no color
+    if _use_rgb_color:
+        rgb = getattr(element, "color", None)
+        if rgb != None:
+            return RGB_PALETTE_LUT.lookup(rgb)
+
+    color_index = element.color_index
+    if color_index == None:
+        return None
+    return LIVE_COLOR_PALETTE_INDICES[color_index] if 0 <= color_index < LIVE_COLOR_COUNT else 0
+
 def make_color_from_element(element):
     if liveobj_valid(element):
-        if element.color_index != None:
-            return make_color(*LIVE_COLOR_MAP.get(element.color_index, (0, 0)))
-            #return SimpleColor(element.color_index)
+        palette_index = palette_index_for_element(element)
+        if palette_index != None:
+            return ELEMENT_COLORS[palette_index]
         else:
-            return make_color(WHITE, LEVEL_3)
+            return NO_COLOR_INDEX_COLOR
     else:
         return BasicColors.OFF
 
 def make_keyboard_color(element, accent = False, group = False):
     if liveobj_valid(element):
-        if element.color_index != None:
-            base_color, brightness = LIVE_COLOR_MAP.get(element.color_index, (0, 0))
+        palette_index = palette_index_for_element(element)
+        if palette_index != None:
             if accent:
-                return make_color(base_color, LEVEL_3 if brightness < LEVEL_4 else LEVEL_2)
+                return KEYBOARD_ACCENT_COLORS[palette_index]
             elif group:
-                return make_color(base_color, LEVEL_2 if brightness < LEVEL_4 else LEVEL_4)
+                return KEYBOARD_GROUP_COLORS[palette_index]
             else:
-                return make_color(base_color, LEVEL_1 if brightness < LEVEL_4 else LEVEL_4)
+                return KEYBOARD_COLORS[palette_index]
     return BasicColors.OFF
 
 def make_velocity_color(element, level = LEVEL_1):
     if liveobj_valid(element):
-        if element.color_index != None:
-            base_color, brightness = LIVE_COLOR_MAP.get(element.color_index, (0, 0))
-            return make_color(base_color, level)
-    BasicColors.ON
+        palette_index = palette_index_for_element(element)
+        if palette_index != None:
+            return VELOCITY_COLORS[level][palette_index]
+    return BasicColors.ON
+
+# Memoizes result of skin color function per element color.
+# Key is color value itself (color_index or RGB), so color changes of element never hit stale entries.
+ELEMENT_COLOR_CACHES = []
+
+class ElementColorCache:
+    def __init__(self, name, function):
+        self._name = name
+        self._function = function
+        self._colors = {}
+        self.hits = 0
+        self.misses = 0
+        ELEMENT_COLOR_CACHES.append(self)
+
+    def __call__(self, element):
+        if not liveobj_valid(element):
+            return self._function(element)
+
+        key = element_color_key(element)
+        color = self._colors.get(key)
+        if color != None:
+            self.hits += 1
+            return color
+
+        self.misses += 1
+        color = self._function(element)
+        self._colors[key] = color
+        return color
+
+    def clear(self):
+        self._colors = {}
+
+    def log_stats(self):
+        total = self.hits + self.misses
+        if total > 0:
+            logger.info(f"Color cache {self._name}: hits = {self.hits}, misses = {self.misses}, hit rate = {self.hits / total:.1%}")
+
+def log_element_color_cache_stats():
+    for cache in ELEMENT_COLOR_CACHES:
+        cache.log_stats()
 
 class MaschineLEDColors:
 
@@ -315,14 +522,19 @@ class MaschineLEDColors:
         Slot = BasicColors.OFF
         SlotRecordButton = make_color(WHITE, LEVEL_1)
         NoSlot = BasicColors.OFF
-        ClipStopped = make_color_from_element
+        ClipStopped = ElementColorCache("Session.ClipStopped", make_color_from_element)
         ClipTriggeredPlay = make_color(GREEN, LEVEL_2)
         ClipTriggeredRecord = make_color(RED, LEVEL_1)
         ClipPlaying = make_color(GREEN, LEVEL_3)
         ClipRecording = make_color(RED, LEVEL_3)
         ClipPlayingDimmed = make_color(GREEN, LEVEL_2)
         ClipRecordingDimmed = make_color(RED, LEVEL_2)
-        Scene = make_color_from_element
+        # Additional animation frames
+        ClipPlayingBright = make_color(GREEN, LEVEL_4)
+        ClipRecordingBright = make_color(RED, LEVEL_4)
+        ClipPlayingFaint = make_color(GREEN, LEVEL_1)
+        ClipRecordingFaint = make_color(RED, LEVEL_1)
+        Scene = ElementColorCache("Session.Scene", make_color_from_element)
         SceneTriggered = make_color(GREEN, LEVEL_3)
         NoScene = BasicColors.OFF
         StopClipTriggered = make_color(WHITE, LEVEL_2)
@@ -333,6 +545,14 @@ class MaschineLEDColors:
         NavigationPressed = make_color(WHITE, LEVEL_4)
         Navigation = make_color(WHITE, LEVEL_2)
 
+    class BlockOverview:
+        Empty = make_color(WHITE, LEVEL_1)
+        HasClips = make_color(WHITE, LEVEL_3)
+        Playing = make_color(GREEN, LEVEL_3)
+        Recording = make_color(RED, LEVEL_3)
+        Selected = make_color(WHITE, LEVEL_4)
+        NoBlock = BasicColors.OFF
+
     class Zooming:
         Selected = make_color(WHITE, LEVEL_4)
         Stopped = make_color(WHITE, LEVEL_2)
@@ -369,7 +589,7 @@ class MaschineLEDColors:
 
     class DrumGroup:
         PadEmpty = BasicColors.OFF
-        PadFilled = make_color_from_element
+        PadFilled = ElementColorCache("DrumGroup.PadFilled", make_color_from_element)
         PadSelected = make_color(WHITE, LEVEL_3)
         PadMuted = make_color(ORANGE, LEVEL_1)
         PadMutedSelected = make_color(ORANGE, LEVEL_4)
@@ -381,13 +601,13 @@ class MaschineLEDColors:
         # Used in custom component
         Group = BasicColors.OFF
         GroupSelected = make_color(WHITE, LEVEL_4)
-        GroupHasFilledPad = partial(make_keyboard_color, group = True)
+        GroupHasFilledPad = ElementColorCache("DrumGroup.GroupHasFilledPad", partial(make_keyboard_color, group = True))
         GroupHasFilledPadSelected = make_color(WHITE, LEVEL_4)
         PadPressed = make_color(WHITE, LEVEL_4)
 
     class SlicedSimpler:
         NoSlice = BasicColors.OFF
-        SliceNotSelected = make_keyboard_color
+        SliceNotSelected = ElementColorCache("SlicedSimpler.SliceNotSelected", make_keyboard_color)
         SliceSelected = make_color(WHITE, LEVEL_3)
         NextSlice = make_color(WHITE, LEVEL_1)
         PadAction = make_color(GREEN, LEVEL_3)
@@ -397,29 +617,38 @@ class MaschineLEDColors:
         SlicePressed = make_color(WHITE, LEVEL_4)
         Group = BasicColors.OFF
         GroupSelected = make_color(WHITE, LEVEL_4)
-        GroupHasSlice = partial(make_keyboard_color, group = True)
+        GroupHasSlice = ElementColorCache("SlicedSimpler.GroupHasSlice", partial(make_keyboard_color, group = True))
         GroupHasSliceSelected = make_color(WHITE, LEVEL_4)
 
     class Keyboard:
         Note = BasicColors.OFF
         NoNote = BasicColors.OFF
-        ScaleNote = make_keyboard_color
-        RootNote = partial(make_keyboard_color, accent = True)
+        ScaleNote = ElementColorCache("Keyboard.ScaleNote", make_keyboard_color)
+        RootNote = ElementColorCache("Keyboard.RootNote", partial(make_keyboard_color, accent = True))
         NotePressed = make_color(WHITE, LEVEL_4)
         NoteSelected = make_color(WHITE, LEVEL_4)
-        Octave = partial(make_keyboard_color, group = True)
+        Octave = ElementColorCache("Keyboard.Octave", partial(make_keyboard_color, group = True))
         OctaveSelected = make_color(WHITE, LEVEL_4)
         Scroll = make_color(WHITE, LEVEL_4)
         ScrollPressed = make_color(WHITE, LEVEL_2)
 
     class VelocityLevels:
-        Level1 = partial(make_velocity_color, level = LEVEL_1)
-        Level2 = partial(make_velocity_color, level = LEVEL_1)
-        Level3 = partial(make_velocity_color, level = LEVEL_2)
-        Level4 = partial(make_velocity_color, level = LEVEL_3)
+        Level1 = ElementColorCache("VelocityLevels.Level1", partial(make_velocity_color, level = LEVEL_1))
+        Level2 = ElementColorCache("VelocityLevels.Level2", partial(make_velocity_color, level = LEVEL_1))
+        Level3 = ElementColorCache("VelocityLevels.Level3", partial(make_velocity_color, level = LEVEL_2))
+        Level4 = ElementColorCache("VelocityLevels.Level4", partial(make_velocity_color, level = LEVEL_3))
         Pressed = make_color(WHITE, LEVEL_4)
         Selected = make_color(WHITE, LEVEL_4)
 
+    class Chord:
+        NoChord = BasicColors.OFF
+        Chord = ElementColorCache("Chord.Chord", make_keyboard_color)
+        RootChord = ElementColorCache("Chord.RootChord", partial(make_keyboard_color, accent = True))
+        Selected = make_color(WHITE, LEVEL_4)
+        Pressed = make_color(WHITE, LEVEL_4)
+        Option = make_color(WHITE, LEVEL_2)
+        OptionOn = make_color(WHITE, LEVEL_4)
+
     class Scale:
         On = make_color(VIOLET, LEVEL_3)
         Off = BasicColors.OFF
@@ -436,7 +665,7 @@ class MaschineLEDColors:
         NoClip = BasicColors.OFF
         StepDisabled = BasicColors.OFF
         StepEmpty = BasicColors.OFF
-        StepFilled = make_color_from_element
+        StepFilled = ElementColorCache("NoteEditor.StepFilled", make_color_from_element)
         StepMuted = make_color(WHITE, LEVEL_1)
 
         class Resolution:
@@ -445,14 +674,34 @@ class MaschineLEDColors:
 
     class LoopSelector:
         InsideLoopSelected = make_color(WHITE, LEVEL_4)
-        InsideLoop = partial(make_keyboard_color, group = True)
+        InsideLoop = ElementColorCache("LoopSelector.InsideLoop", partial(make_keyboard_color, group = True))
         OutsideLoopSelected = make_color(WHITE, LEVEL_4)
         OutsideLoop = BasicColors.OFF
+        # Used in custom component
+        InsideLoopNotes1 = ElementColorCache("LoopSelector.InsideLoopNotes1", partial(make_velocity_color, level = LEVEL_2))
+        InsideLoopNotes2 = ElementColorCache("LoopSelector.InsideLoopNotes2", partial(make_velocity_color, level = LEVEL_3))
+        InsideLoopNotes3 = ElementColorCache("LoopSelector.InsideLoopNotes3", partial(make_velocity_color, level = LEVEL_4))
+        OutsideLoopNotes = make_color(WHITE, LEVEL_1)
         Playhead = make_color(GREEN, LEVEL_3)
         PlayheadRecord = make_color(RED, LEVEL_3)
         NavigationPressed = make_color(WHITE, LEVEL_2)
         Navigation = make_color(WHITE, LEVEL_4)
 
+    class ClipOverview:
+        Density0 = make_color(WHITE, LEVEL_1)
+        Density1 = make_color(CYAN, LEVEL_1)
+        Density2 = make_color(CYAN, LEVEL_2)
+        Density3 = make_color(CYAN, LEVEL_3)
+        Density4 = make_color(CYAN, LEVEL_4)
+        NoRegion = BasicColors.OFF
+
+    class PatternGenerator:
+        Hit = make_color(GREEN, LEVEL_4)
+        Ratchet = make_color(YELLOW, LEVEL_4)
+        Fill = make_color(GREEN, LEVEL_2)
+        Step = make_color(WHITE, LEVEL_1)
+        NoStep = BasicColors.OFF
+
     class Clipboard:
         Empty = BasicColors.OFF
         Filled = BasicColors.ON
@@ -11,4 +11,9 @@
 LOGGING = False
 LOG_LEVEL = "INFO"
 LCD_ENABLED = True
-SKIP_ITEM_COUNT = 5
\ No newline at end of file
+SKIP_ITEM_COUNT = 5
+# Pad pressure is received as one CC per pad on its own channel, first pad uses PAD_PRESSURE_CC.
+# Only "_PadPressure" templates in "Template" folder send these, default templates keep poly aftertouch.
+# Change these templates too when changing channel or CC
+PAD_PRESSURE_CHANNEL = 2
+PAD_PRESSURE_CC = 102
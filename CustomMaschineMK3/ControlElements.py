@@ -118,6 +118,14 @@ class ControlElements(ElementsBase):
 
         add_encoder(64, "PedalTip", map_mode = MapMode.Absolute)
         add_encoder(65, "PedalRing", map_mode = MapMode.Absolute)
+        # Live doesn't forward poly aftertouch to scripts, so pad pressure comes in as CC.
+        # Channel is fixed, "_PadPressure" templates send it on same channel regardless of LCD setting
+        self.add_encoder_matrix(
+            [list(range(Config.PAD_PRESSURE_CC, Config.PAD_PRESSURE_CC + 16))],
+            "Pad_Pressures",
+            channels = Config.PAD_PRESSURE_CHANNEL,
+            map_mode = MapMode.Absolute,
+            is_feedback_enabled = False)
 
         add_button(34, "Channel")
         add_modifier_button(35, "Plugin")
@@ -213,7 +221,7 @@ class ControlElements(ElementsBase):
 
         add_modifier_button(85, "Scene")
         add_modifier_button(86, "Pattern")
-        add_button(87, "Events")
+        add_modifier_button(87, "Events")
         add_button(88, "Variation")
         add_modifier_button(89, "Duplicate")
         add_button(90, "Select")
@@ -341,6 +349,10 @@ class ControlElements(ElementsBase):
         self.add_modified_control(self.lock, self.plugin)
         self.add_modified_control(self.lock, self.noterep)
         self.add_modified_control(self.events, self.erase)
+        self.add_modified_control(self.knobs, self.events)
+        self.add_modified_control(self.pads, self.events)
+        self.add_modified_control(self.encoderpush, self.events)
+        self.add_modified_control(self.pads, self.pattern)
         self.add_modified_control(self.duplicate, self.shift)
         self.add_modified_control(self.solo, self.erase)
         self.add_modified_control(self.mute, self.erase)
@@ -351,3 +363,6 @@ class ControlElements(ElementsBase):
         self.add_modified_control(self.column3_pads, self.scene)
         self.add_modified_control(self.stop, self.shift)
         self.add_modified_control(self.erase, self.shift)
+        self.add_modified_control(self.chords, self.shift)
+        self.add_modified_control(self.padmode, self.shift)
+        self.add_modified_control(self.mixer, self.shift)
@@ -24,29 +24,106 @@ from Live.Base import Timer # type: ignore
 
 from .Logger import logger
 
-class LEDBlinker(EventObject):
-    def __init__(self, blink_time = 0.5):
-        self._blink_time = blink_time * 1000
-        self._blink_state = True
-        self._timer = Timer(callback = self.timer_callback, interval = int(self._blink_time), start = True)
+ANIMATED_CLIP_COLORS = ("Session.ClipPlaying", "Session.ClipRecording")
 
-    @listenable_property
-    def blink_state(self):
-        return self._blink_state
+# Suffix of skin color name shown on each frame, appended to base color name.
+# Colors of all frames are resolved when slot subscribes, frame change only writes them.
+ANIMATION_SHAPES = {
+    "Blink": ("", "Dimmed"),
+    "Pulse": ("Bright", "", "Dimmed", "Faint", "Dimmed", ""),
+    "Fade": ("Bright", "", "Dimmed", "Faint"),
+}
+
+class ClipAnimator(EventObject):
+    # Only clip slots showing playing or recording clip are subscribed,
+    # other slots never receive anything from animation timer.
+    def __init__(self, settings = None):
+        self._settings = settings
+        self._subscribers = {}
+        self._frame_names = {}
+        self._phase = 0
+        self._frames = ANIMATION_SHAPES["Blink"]
+        self._frame_interval = 500
+        self._timer = Timer(callback = self.timer_callback, interval = self._frame_interval, start = False)
+        self._is_running = False
+        self._on_settings_changed.subject = self._settings
+        self._on_settings_changed()
+
+    @property
+    def phase(self):
+        return self._phase
+
+    def frame_names(self, base_name):
+        names = self._frame_names.get(base_name)
+        if names == None:
+            names = tuple(base_name + suffix for suffix in self._frames)
+            self._frame_names[base_name] = names
+        return names
+
+    def subscribe(self, clip_slot, base_name):
+        # Returns color name of current frame
+        names = self.frame_names(base_name)
+        self._subscribers[clip_slot] = names
+        if not self._is_running:
+            self._is_running = True
+            self._timer.restart()
+        return names[self._phase]
+
+    def unsubscribe(self, clip_slot):
+        self._subscribers.pop(clip_slot, None)
+        if self._is_running and len(self._subscribers) == 0:
+            self._is_running = False
+            self._timer.stop()
 
     def timer_callback(self):
-        self._blink_state = not self._blink_state
-        #logger.info(f"Blink state = {self._blink_state}")
+        if not self._is_running:
+            return
+
+        self._phase = (self._phase + 1) % len(self._frames)
+        phase = self._phase
+        for clip_slot, names in list(self._subscribers.items()):
+            button = clip_slot.launch_button
+            if button.control_element != None:
+                button.color = names[phase % len(names)]
         self._timer.restart()
-        self.notify_blink_state()
+
+    @listens("value_changed")
+    def _on_settings_changed(self):
+        if self._settings == None:
+            return
+
+        frames = ANIMATION_SHAPES[self._settings.get_value("clip_animation")]
+        period = self._settings.get_value("clip_animation_period") * 100
+        if frames != self._frames:
+            self._frames = frames
+            self._frame_names = {}
+            self._phase = 0
+            # Subscribers hold names of old shape, next color update resubscribes them
+            for clip_slot in list(self._subscribers.keys()):
+                clip_slot.update()
+
+        frame_interval = max(1, period // len(frames))
+        if frame_interval != self._frame_interval:
+            self._frame_interval = frame_interval
+            self._timer.stop()
+            self._timer = Timer(callback = self.timer_callback, interval = self._frame_interval, start = self._is_running)
+
+    def disconnect(self):
+        self._timer.stop()
+        self._subscribers = {}
+        super().disconnect()
 
 class CustomClipSlotComponent(ClipSlotComponent):
-    @depends(blinker = None)
-    def __init__(self, clipboard = None, blinker = None, *a, **k):
+    @depends(clip_animator = None)
+    def __init__(self, clipboard = None, clip_animator = None, *a, **k):
         super().__init__(*a, **k)
-        self._blinker = blinker
-        self._on_blink_state_changed.subject = self._blinker
-        self._blink_state = self._blinker.blink_state
+        self._clip_animator = clip_animator
+
+    def set_launch_button(self, button):
+        # Slot without launch button has nothing to animate
+        if button == None:
+            self._clip_animator.unsubscribe(self)
+        super().set_launch_button(button)
 
     def _update_launch_button_color(self):
         super()._update_launch_button_color()
@@ -56,20 +133,26 @@ class CustomClipSlotComponent(ClipSlotComponent):
         # Ableton has changed the return value of this function, so it has to consider two patterns
         # Earlier version always returns LiveObjSkinEntry
         # Later version (maybe 12.1?) returns str or OptionalSkinEntry
-        if not self._blink_state:
+        if isinstance(skin_or_str, LiveObjSkinEntry):
+            name = skin_or_str.name
+        elif isinstance(skin_or_str, str):
+            name = skin_or_str
+        else:
+            name = None
+
+        if name in ANIMATED_CLIP_COLORS and self.launch_button.control_element != None:
+            frame_name = self._clip_animator.subscribe(self, name)
             if isinstance(skin_or_str, LiveObjSkinEntry):
-                if skin_or_str.name == "Session.ClipPlaying" or skin_or_str.name == "Session.ClipRecording":
-                    skin_or_str.name += "Dimmed"
-            elif isinstance(skin_or_str, str):
-                if skin_or_str == "Session.ClipPlaying" or skin_or_str == "Session.ClipRecording":
-                    skin_or_str += "Dimmed"
+                skin_or_str.name = frame_name
+            else:
+                skin_or_str = frame_name
+        else:
+            self._clip_animator.unsubscribe(self)
         
         # logger.info(f"Clip color = {skin_or_str}")
 
         return skin_or_str
 
-    @listens("blink_state")
-    def _on_blink_state_changed(self):
-        self._blink_state = self._blinker.blink_state
-        if self.launch_button.control_element != None:
-            self._update_launch_button_color()
\ No newline at end of file
+    def disconnect(self):
+        self._clip_animator.unsubscribe(self)
+        super().disconnect()
@@ -10,7 +10,6 @@
 
 from itertools import zip_longest
 from ableton.v3.base import listens, listens_group
-from ableton.v3.control_surface.skin import LiveObjSkinEntry
 from ableton.v3.control_surface.components import DrumGroupComponent
 from ableton.v3.control_surface.controls import (
     control_matrix,
@@ -20,31 +19,87 @@ from ableton.v3.control_surface.controls import (
 
 from .Logger import logger
 from .ClipNotesSelectMixin import ClipNotesSelectMixin
+from .LedColorCacheMixin import LedColorCacheMixin
 
 DEFAULT_GROUP_SIZE = 16
+GROUP_COUNT = 8
+FIRST_GROUP_END_NOTE = 4 + DEFAULT_GROUP_SIZE
+
+def group_index_for_note(note):
+    # First group also contains notes below its start note (0 to 3)
+    return 0 if note < FIRST_GROUP_END_NOTE else min((note - 4) // DEFAULT_GROUP_SIZE, GROUP_COUNT - 1)
+
+def iterate_bits(bits):
+    while bits:
+        lowest = bits & -bits
+        yield lowest.bit_length() - 1
+        bits ^= lowest
+
+# Chain, mute and solo states of all drum pads as bitsets indexed by note.
+# Only the pad which fired listener is re-read, instead of scanning all 128 pads.
+class DrumRackState:
+    def __init__(self):
+        self.reset([])
+
+    def reset(self, pads):
+        self._pads = {}
+        self._chain_bits = 0
+        self._mute_bits = 0
+        self._solo_bits = 0
+        self._group_chain_counts = [0] * GROUP_COUNT
+        for pad in pads:
+            if pad is not None:
+                self._pads[pad.note] = pad
+                self.update_pad(pad)
+
+    def update_pad(self, pad):
+        # Returns True if chain count of the pad's group is changed
+        bit = 1 << pad.note
+        self._mute_bits = self._mute_bits | bit if pad.mute else self._mute_bits & ~bit
+        self._solo_bits = self._solo_bits | bit if pad.solo else self._solo_bits & ~bit
+
+        had_chain = bool(self._chain_bits & bit)
+        has_chain = len(pad.chains) > 0
+        if had_chain == has_chain:
+            return False
+
+        self._chain_bits ^= bit
+        self._group_chain_counts[group_index_for_note(pad.note)] += 1 if has_chain else -1
+        return True
 
-class CustomDrumGroupComponent(DrumGroupComponent, ClipNotesSelectMixin):
+    def group_has_chain(self, group_index):
+        return self._group_chain_counts[group_index] > 0
+
+    def soloed_pads(self):
+        return [self._pads[note] for note in iterate_bits(self._solo_bits)]
+
+    def muted_pads(self):
+        return [self._pads[note] for note in iterate_bits(self._mute_bits)]
+
+class CustomDrumGroupComponent(DrumGroupComponent, ClipNotesSelectMixin, LedColorCacheMixin):
     select_buttons = control_matrix(ButtonControl, color = None)
     clear_all_solo_button = ButtonControl(color = None)
     clear_all_mute_button = ButtonControl(color = None)
 
     _group_start_notes = list(range(4, 128, DEFAULT_GROUP_SIZE))
-    _has_chain_list = []
 
     def __init__(self, *a, **k):
+        self._drum_rack_state = DrumRackState()
         super().__init__(*a, **k, matrix_always_listenable = True)
 
     def set_select_buttons(self, matrix):
         self.select_buttons.set_control_element(matrix)
-        self._has_chain_list = [False] * self.select_buttons.control_count
         if matrix is not None:
-            self._update_group_info()
             self._update_led_feedback()
 
     def set_drum_group_device(self, drum_group_device):
         super().set_drum_group_device(drum_group_device)
         self._on_chains_changed.replace_subjects(self._all_drum_pads)
-        self._on_chains_changed(None)
+        self._on_mute_changed.replace_subjects(self._all_drum_pads)
+        self._on_solo_changed.replace_subjects(self._all_drum_pads)
+        self._drum_rack_state.reset(self._all_drum_pads)
+        logger.info(f"Drum rack state reset, groups with chain = {[self._drum_rack_state.group_has_chain(index) for index in range(GROUP_COUNT)]}")
+        self._update_led_feedback()
 
     def set_matrix(self, matrix):
         super().set_matrix(matrix)
@@ -57,8 +112,10 @@ class CustomDrumGroupComponent(DrumGroupComponent, ClipNotesSelectMixin):
 
     def _update_led_feedback(self):
         super()._update_led_feedback()
-        for button, has_chain in zip(self.select_buttons, self._has_chain_list):
+        self._validate_led_cache(self._target_track.target_track)
+        for button in self.select_buttons:
             row, column = button.coordinate
+            has_chain = self._drum_rack_state.group_has_chain(row * self.width + column)
 
             # check visible pads window intersects each group regions
             # testing lower row (position) and upper row (position + 3) 
@@ -74,29 +131,11 @@ class CustomDrumGroupComponent(DrumGroupComponent, ClipNotesSelectMixin):
             if intersects:
                 new_color += "Selected"
 
-            button.color = LiveObjSkinEntry(new_color, self._target_track.target_track)
+            self._set_led_color(button, new_color)
 
     def _update_button_color(self, button):
-        super()._update_button_color(button)
-        button.pressed_color = "DrumGroup.PadPressed"
-
-    def _update_group_info(self):
-        button_count = self.select_buttons.control_count
-        groups = list(zip(range(button_count), self._group_start_notes))
-        has_chain_list = [False] * button_count
-        logger.info(f"Update group info groups = {groups}")
-
-        for pad in self._all_drum_pads:
-            if pad is not None:
-                logger.debug(f"pad note {pad.note}, chain len = {len(pad.chains)}")
-                for index, start_note in groups:
-                    if pad.note < start_note + DEFAULT_GROUP_SIZE and len(pad.chains):
-                        logger.debug(f"pad note {pad.note} group {index} has chain")
-                        has_chain_list[index] = True
-                        break
-        
-        logger.info(f"has_chain_list = {has_chain_list}")
-        self._has_chain_list = has_chain_list
+        self._validate_led_cache(self._target_track.target_track)
+        self._set_recorded_led_color(button, super()._update_button_color, "DrumGroup.PadPressed")
 
     @select_buttons.pressed
     def _on_group_select_buttons_pressed(self, target_button):
@@ -110,20 +149,26 @@ class CustomDrumGroupComponent(DrumGroupComponent, ClipNotesSelectMixin):
 
     @clear_all_solo_button.pressed
     def _on_clear_all_solo_pressed(self, button):
-        for pad in self._all_drum_pads:
-            if pad.solo:
-                pad.solo = False
+        for pad in self._drum_rack_state.soloed_pads():
+            pad.solo = False
 
     @clear_all_mute_button.pressed
     def _on_clear_all_mute_pressed(self, button):
-        for pad in self._all_drum_pads:
-            if pad.mute:
-                pad.mute = False
+        for pad in self._drum_rack_state.muted_pads():
+            pad.mute = False
 
     @listens_group("chains")
     def _on_chains_changed(self, subject):
-        self._update_group_info()
-        self._update_led_feedback()
+        if self._drum_rack_state.update_pad(subject):
+            self._update_led_feedback()
+
+    @listens_group("mute")
+    def _on_mute_changed(self, subject):
+        self._drum_rack_state.update_pad(subject)
+
+    @listens_group("solo")
+    def _on_solo_changed(self, subject):
+        self._drum_rack_state.update_pad(subject)
 
     def _get_actual_group_scroll_position(self, group_index):
         # make sure not exceeding max scroll position when selecting last group
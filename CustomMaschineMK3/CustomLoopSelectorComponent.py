@@ -8,49 +8,198 @@
 #
 # ==================================================
 
+from array import array
 from ableton.v3.control_surface.components import LoopSelectorComponent, ClipboardComponent
 from ableton.v3.control_surface.controls import ButtonControl
 from ableton.v3.live import liveobj_valid, liveobj_changed
-from ableton.v3.base import listens
+from ableton.v3.control_surface.skin import LiveObjSkinEntry
+from ableton.v3.base import depends, listens
+from Live.Clip import MidiNoteSpecification # type: ignore
 
 from .Logger import logger
 
+# Upper limit of notes kept in clipboard
+# 16 pads x 32nd notes x 16 bars fits in this size, and buffer size stays around 300KB
+MAX_CLIPBOARD_NOTES = 8192
+
 class ClipRegion:
     def __init__(self, time, length):
         self.time = time
         self.length = length
 
+# Note storage for clipboard
+# Keeping MidiNote objects from Live costs a lot of memory for dense patterns,
+# so note properties are packed into typed arrays with times relative to copied region.
+class CompactNoteBuffer:
+    def __init__(self, max_notes = MAX_CLIPBOARD_NOTES):
+        self._max_notes = max_notes
+        self.clear()
+
+    def __len__(self):
+        return len(self._pitches)
+
+    def clear(self):
+        self._pitches = array("B")
+        self._mutes = array("B")
+        self._start_times = array("d")
+        self._durations = array("d")
+        self._velocities = array("f")
+        self._velocity_deviations = array("f")
+        self._release_velocities = array("f")
+        self._probabilities = array("f")
+
+    def capture(self, notes, origin):
+        self.clear()
+        for note in notes[:self._max_notes]:
+            self._pitches.append(note.pitch)
+            self._mutes.append(1 if note.mute else 0)
+            self._start_times.append(note.start_time - origin)
+            self._durations.append(note.duration)
+            self._velocities.append(note.velocity)
+            self._velocity_deviations.append(note.velocity_deviation)
+            self._release_velocities.append(note.release_velocity)
+            self._probabilities.append(note.probability)
+
+        if len(notes) > self._max_notes:
+            logger.warning(f"Clipboard is full, {len(notes) - self._max_notes} notes are dropped")
+
+    def to_note_specifications(self, origin):
+        return tuple(MidiNoteSpecification(
+            pitch = self._pitches[index],
+            start_time = self._start_times[index] + origin,
+            duration = self._durations[index],
+            velocity = self._velocities[index],
+            mute = self._mutes[index] == 1,
+            probability = self._probabilities[index],
+            velocity_deviation = self._velocity_deviations[index],
+            release_velocity = self._release_velocities[index]) for index in range(len(self._pitches)))
+
 class ClipRegionClipboardComponent(ClipboardComponent):
     def __init__(self, *a, **k):
         super().__init__(*a, **k)
         self._clip = None
+        self._source_clip = None
+        self._notes = CompactNoteBuffer()
 
     def set_clip(self, new_clip):
+        # Keep copied notes when target clip is changed, so they can be pasted into other clips
         self._clip = new_clip
-        self.clear()
-    
+
+    def clear(self):
+        self._notes.clear()
+        self._source_clip = None
+        super().clear()
+
+    def erase(self, region):
+        if self._can_edit_notes(self._clip):
+            self._clip.remove_notes_extended(
+                from_pitch = 0,
+                pitch_span = 128,
+                from_time = region.time,
+                time_span = region.length)
+
+    def _do_copy(self, obj):
+        if not self._can_edit_notes(self._clip):
+            return None
+
+        notes = self._clip.get_notes_extended(
+            from_pitch = 0,
+            pitch_span = 128,
+            from_time = obj.time,
+            time_span = obj.length)
+        self._notes.capture(notes, obj.time)
+        self._source_clip = self._clip
+        logger.info(f"Copy {len(self._notes)} notes, time = {obj.time}, length = {obj.length}")
+
+        return super()._do_copy(obj)
+
     def _do_paste(self, obj):
         logger.info(f"source = {self._source_obj}, dest = {obj}")
-        if self._source_obj.time == obj.time:
+        if self._source_obj.time == obj.time and not liveobj_changed(self._source_clip, self._clip):
             self._did_paste = True
         else:
-            self._clip.duplicate_region(self._source_obj.time, self._source_obj.length, obj.time)
+            # Replace notes in destination region, each step is done by single call
+            self.erase(ClipRegion(obj.time, self._source_obj.length))
+            notes = self._notes.to_note_specifications(obj.time)
+            if len(notes) > 0:
+                self._clip.add_new_notes(notes)
+                self._clip.deselect_all_notes()
             self._did_paste = super()._do_paste(obj)
 
         return self._did_paste
     
     def _is_source_valid(self):
-        return liveobj_valid(self._clip) and self._source_obj != None
+        return self._can_edit_notes(self._clip) and self._source_obj != None
+
+    def _can_edit_notes(self, clip):
+        return liveobj_valid(clip) and clip.is_midi_clip
+
+# Note count thresholds for bar occupancy levels
+# A bar has level N if it contains at least BAR_DENSITY_THRESHOLDS[N - 1] notes
+BAR_DENSITY_THRESHOLDS = (1, 8, 24)
+
+# Note count of each bar maintained from note differences
+class BarNoteCounter:
+    def __init__(self, bar_length = 4.0):
+        self._bar_length = bar_length
+        self._counts = {}
+
+    @property
+    def bar_length(self):
+        return self._bar_length
+
+    def count(self, bar_index):
+        return self._counts.get(bar_index, 0)
+
+    def density_level(self, bar_index):
+        count = self._counts.get(bar_index, 0)
+        level = 0
+        for threshold in BAR_DENSITY_THRESHOLDS:
+            if count >= threshold:
+                level += 1
+        return level
+
+    def reset(self, positions, bar_length):
+        self._bar_length = bar_length
+        self._counts = {}
+        return self.apply(positions, [])
+
+    def apply(self, added, removed):
+        # Returns set of bar indices whose count has changed
+        changed_bars = set()
+        for _, start_time in added:
+            bar_index = int(start_time // self._bar_length)
+            self._counts[bar_index] = self._counts.get(bar_index, 0) + 1
+            changed_bars.add(bar_index)
+
+        for _, start_time in removed:
+            bar_index = int(start_time // self._bar_length)
+            count = self._counts.get(bar_index, 0) - 1
+            if count > 0:
+                self._counts[bar_index] = count
+            else:
+                self._counts.pop(bar_index, None)
+            changed_bars.add(bar_index)
+
+        return changed_bars
 
 class CustomLoopSelectorComponent(LoopSelectorComponent):
     copy_button = ButtonControl(color = "Clipboard.Empty", on_color = "Clipboard.Filled")
 
     _custom_clipboard = None
+    _clip_note_index = None
+    _bar_note_counter = None
 
-    def __init__(self, name = "Loop_Selector", custom_clipboard_component_type = None, paginator = None, *a, **k):
+    @depends(clip_note_index = None)
+    def __init__(self, name = "Loop_Selector", custom_clipboard_component_type = None, paginator = None, clip_note_index = None, *a, **k):
         super().__init__(name = name, paginator = paginator, *a, **k)
         custom_clipboard_component_type = custom_clipboard_component_type or ClipRegionClipboardComponent
         self._custom_clipboard = custom_clipboard_component_type(parent = self)
+        self._bar_note_counter = BarNoteCounter()
+        self._clip_note_index = clip_note_index
+        self._on_note_diff.subject = self._clip_note_index
+        self._on_clip_notes_changed.subject = self._clip_note_index
+        self._reset_bar_note_counter()
         self._on_target_clip_changed.subject = self._sequencer_clip
         self._on_clipboard_content_changed.subject = self._custom_clipboard
         self._on_target_clip_changed()
@@ -70,6 +219,64 @@ class CustomLoopSelectorComponent(LoopSelectorComponent):
     def _on_target_clip_changed(self):
         self._custom_clipboard.set_clip(self._sequencer_clip.clip)
 
+    @listens("notes_changed")
+    def _on_clip_notes_changed(self):
+        # Note index is read again only while bar colors are visible
+        if self.is_enabled():
+            self._clip_note_index.validate()
+
+    @listens("note_diff")
+    def _on_note_diff(self, added, removed, reset):
+        if reset:
+            self._reset_bar_note_counter()
+            changed = True
+        else:
+            changed = len(self._bar_note_counter.apply(added, removed)) > 0
+
+        if changed and self.is_enabled():
+            # update() recalculates page colors too
+            self.update()
+
+    def _reset_bar_note_counter(self):
+        positions = self._clip_note_index.note_positions if self._clip_note_index != None else []
+        self._bar_note_counter.reset(positions, self.bar_length)
+
+    def show_time(self, time):
+        # Move to the page which contains specified time, used by overview pads
+        self._paginator.select_page_in_point(time)
+
+    def _update_page_colors(self):
+        super()._update_page_colors()
+        if self._bar_note_counter.bar_length != self.bar_length:
+            # Bar length changes only when time signature is changed, recount notes in this case
+            self._reset_bar_note_counter()
+
+        # Replace page colors with ones including note density of each bar
+        page_colors = list(self._page_colors)
+        for index, color in enumerate(page_colors):
+            level = self._bar_note_counter.density_level(index)
+            if level > 0:
+                page_colors[index] = self._to_density_color(color, level)
+        self._page_colors = page_colors
+
+    def _to_density_color(self, skin_or_str, level):
+        # Page color may be LiveObjSkinEntry or str depending on Live version
+        name = skin_or_str.name if isinstance(skin_or_str, LiveObjSkinEntry) else skin_or_str
+        if name == "LoopSelector.InsideLoop":
+            name = f"LoopSelector.InsideLoopNotes{level}"
+        elif name == "LoopSelector.OutsideLoop":
+            name = "LoopSelector.OutsideLoopNotes"
+        else:
+            return skin_or_str
+
+        if isinstance(skin_or_str, LiveObjSkinEntry):
+            skin_or_str.name = name
+            return skin_or_str
+        return name
+
     def update(self):
+        # Notes changed while hidden are applied before drawing
+        if self._clip_note_index != None:
+            self._clip_note_index.validate()
         super().update()
         self._on_clipboard_content_changed(self._custom_clipboard.has_content)
@@ -47,7 +47,7 @@ from ableton.v3.control_surface.elements import SimpleColor, RgbColor, create_rg
 
 from .ControlElements import ControlElements
 from .Mappings import create_mappings
-from .ColorSkin import MaschineSkin
+from .ColorSkin import MaschineSkin, set_rgb_color_mapping, log_element_color_cache_stats
 from .DisplayDefinitions import (
     MaschineDisplay,
     make_mcu_display_header,
@@ -69,10 +69,14 @@ from .CustomClipActionsComponent import CustomClipActionsComponent
 from .CustomSlicedSimplerComponent import CustomSlicedSimplerComponent
 from .NoteRepeatComponent import NoteRepeatComponent
 from .VelocityLevelsComponent import VelocityLevelsComponent
+from .ChordPadsComponent import ChordPadsComponent
 from .ScaleSystemComponent import ScaleSystemComponent
 from .SelectedParameterControlComponent import SelectedParameterControlComponent
 from .CustomNoteEditorComponent import CustomNoteEditorComponent, CustomStepSequenceComponent
 from .CustomLoopSelectorComponent import CustomLoopSelectorComponent
+from .ClipOverviewComponent import ClipOverviewComponent
+from .SessionBlockOverviewComponent import SessionBlockOverviewComponent
+from .NameSearchComponent import NameSearchComponent
 from .ClipEditorComponent import ClipEditorComponent
 from .BrowserComponent import BrowserComponent
 from .RecordingMethod import FixedLengthRecordingMethod, CustomViewBasedRecordingComponent
@@ -80,8 +84,11 @@ from .EncoderModeControlComponent import EncoderModeControlComponent
 from .GroupButtonModeControlComponent import GroupButtonModeControlComponent
 from .CustomTransportComponent import CustomTransportComponent
 from .SettingsComponent import SettingsRepository, SettingsComponent
-from .CustomClipSlotComponent import LEDBlinker, CustomClipSlotComponent
+from .CustomClipSlotComponent import ClipAnimator, CustomClipSlotComponent
+from .ClipNotesSelectMixin import ClipNoteIndex
+from .TrackIndex import TrackIndex
 from .PageableBackgroundComponent import PageableBackgroundComponent
+from .PatternGeneratorComponent import PatternGeneratorComponent
 
 from .Logger import logger
 from . import Config
@@ -136,6 +143,7 @@ class Specification(ControlSurfaceSpecification):
         "Selected_Parameter": SelectedParameterControlComponent,
         "Scale_System": ScaleSystemComponent,
         "Velocity_Levels": VelocityLevelsComponent,
+        "Chord_Pads": ChordPadsComponent,
         "Note_Repeat": NoteRepeatComponent,
         "Sliced_Simpler": CustomSlicedSimplerComponent,
         "Drum_Group": CustomDrumGroupComponent,
@@ -146,6 +154,10 @@ class Specification(ControlSurfaceSpecification):
         "Maschine_Playable": MaschinePlayableComponent,
         "Misc_Control": MiscControlComponent,
         "Device_Navigation": CustomDeviceNavigationComponent,
+        "Pattern_Generator": PatternGeneratorComponent,
+        "Clip_Overview": ClipOverviewComponent,
+        "Session_Block_Overview": SessionBlockOverviewComponent,
+        "Name_Search": NameSearchComponent,
     }
     parameter_bank_definitions = CUSTOM_BANK_DEFINITIONS
 
@@ -160,6 +172,7 @@ DEFAULT_MODE = "default"
 KEYBOARD_MODE = "keyboard"
 DRUMRACK_MODE = "drum_rack"
 SIMPLER_MODE = "simpler"
+CHORD_PADS_MODE = "chord_pads"
 
 CUSTOM_GRID_RESOLUTIONS = (
     GridResolution("1/4", 1.0, GridQuantization.g_quarter, False),
@@ -176,6 +189,7 @@ GRID_DEFAULT_INDEX = 4
 class CustomMaschineMK3(ControlSurface):
     _grid_resolution = None
     _sequencer_clip = None
+    _clip_note_index = None
     _pad_mode = None
     _step_sequencer = None
     _playable_mode_list = (KEYBOARD_MODE, DRUMRACK_MODE, SIMPLER_MODE)
@@ -186,12 +200,16 @@ class CustomMaschineMK3(ControlSurface):
     }
     _current_drum_group = None
     _current_sliced_simpler = None
+    _current_playable_mode = KEYBOARD_MODE
+    _chord_input_enabled = False
     _display_mode = None
     _settings = None
+    _clip_animator = None
 
     def __init__(self, *a, **k):
         # Settings must be loaded before initialization
         self._settings = SettingsRepository()
+        set_rgb_color_mapping(self._settings.get_value("led_color_mapping") == "RGB")
         self._init_specification()
         super().__init__(Specification, *a, **k)
         logger.info(dir(self._c_instance))
@@ -219,6 +237,7 @@ class CustomMaschineMK3(ControlSurface):
         Specification.component_map["Step_Sequence"] = partial(
             CustomStepSequenceComponent,
             note_editor_component_type = CustomNoteEditorComponent,
+            loop_selector_component_type = CustomLoopSelectorComponent,
             playhead_notes = tuple(playhead_notes),
             playhead_triplet_notes = tuple(triplet_playhead_notes),
             playhead_channels = [1])
@@ -265,9 +284,19 @@ class CustomMaschineMK3(ControlSurface):
         return self._sequencer_clip
         
     @lazy_attribute
-    def _create_blinker(self):
-        self._blinker = LEDBlinker()
-        return self._blinker
+    def _create_clip_note_index(self):
+        self._clip_note_index = ClipNoteIndex(sequencer_clip = self._create_sequencer_clip)
+        return self._clip_note_index
+
+    @lazy_attribute
+    def _create_track_index(self):
+        self._track_index = TrackIndex(song = self.song)
+        return self._track_index
+
+    @lazy_attribute
+    def _create_clip_animator(self):
+        self._clip_animator = ClipAnimator(settings = self._settings)
+        return self._clip_animator
     
     def _get_knob_mapped_parameter(self, index):
         if index >= 0 and index < len(self.elements.knobs_raw):
@@ -280,11 +309,13 @@ class CustomMaschineMK3(ControlSurface):
         inject_dict = {
             "grid_resolution": lambda: self._create_grid_resolution,
             "sequencer_clip": lambda: self._create_sequencer_clip,
+            "clip_note_index": lambda: self._create_clip_note_index,
+            "track_index": lambda: self._create_track_index,
             "note_repeat": const(self._c_instance.note_repeat),
             "velocity_levels": const(self._c_instance.velocity_levels),
             "get_knob_mapped_parameter": const(self._get_knob_mapped_parameter),
             "settings": const(self._settings),
-            "blinker": lambda: self._create_blinker,
+            "clip_animator": lambda: self._create_clip_animator,
         }
         
         return inject_dict
@@ -298,6 +329,8 @@ class CustomMaschineMK3(ControlSurface):
             self.component_map["Maschine_Playable"].set_scale_system(self.component_map["Scale_System"])
             self.component_map["Step_Sequence"]._note_editor.set_velocity_levels(self.component_map["Velocity_Levels"])
             self.component_map["Clip_Editor"].set_step_sequence(self.component_map["Step_Sequence"])
+            self.component_map["Pattern_Generator"].set_step_sequence(self.component_map["Step_Sequence"])
+            self.component_map["Clip_Overview"].set_step_sequence(self.component_map["Step_Sequence"])
             encoder_mode_control = self.component_map["Encoder_Mode_Control"]
             encoder_mode_control.set_encoder_modes(self.component_map["Encoder_Modes"])
             display_mode = self.component_map["Display_Modes"]
@@ -310,9 +343,12 @@ class CustomMaschineMK3(ControlSurface):
 
     def disconnect(self):
         super().disconnect()
+        if self._clip_animator != None:
+            self._clip_animator.disconnect()
 
         # Save settings
         self._settings.save()
+        log_element_color_cache_stats()
 
         # Clear display
         for line in range(4):
@@ -331,7 +367,14 @@ class CustomMaschineMK3(ControlSurface):
                     self._select_playable_mode(KEYBOARD_MODE)
 
     def _on_pad_mode_changed(self, component):
-        is_playable_enabled = self.get_pad_mode() in self._playable_mode_list
+        mode = self.get_pad_mode()
+        # Chord pads provide sequencer pitches only while chord pads mode is active
+        chord_input_enabled = mode == CHORD_PADS_MODE
+        if chord_input_enabled != self._chord_input_enabled:
+            self._chord_input_enabled = chord_input_enabled
+            self._update_pitch_providers()
+
+        is_playable_enabled = mode in self._playable_mode_list
         state = "On" if is_playable_enabled else "Off"
         self.elements.keyboard.send_value(MaschineSkin[f"DefaultButton.{state}"].midi_value)
 
@@ -403,10 +446,17 @@ class CustomMaschineMK3(ControlSurface):
         return self.component_map["Pad_Modes"].selected_mode
 
     def _select_playable_mode(self, mode, update_mode = True):
+        self._current_playable_mode = mode
         if update_mode:
             self.component_map["Pad_Modes"].selected_mode = mode
-        self.component_map["Step_Sequence"].set_pitch_provider(self.component_map[self._provider_list[mode]])
-        self.component_map["Velocity_Levels"].set_pitch_provider(self.component_map[self._provider_list[mode]])
+        self._update_pitch_providers()
+
+    def _update_pitch_providers(self):
+        provider = self.component_map[self._provider_list[self._current_playable_mode]]
+        sequencer_provider = self.component_map["Chord_Pads"] if self._chord_input_enabled else provider
+        self.component_map["Step_Sequence"].set_pitch_provider(sequencer_provider)
+        self.component_map["Velocity_Levels"].set_pitch_provider(provider)
+        self.component_map["Pattern_Generator"].set_pitch_provider(provider)
 
     def refresh_state(self):
         logger.info("Refresh state")
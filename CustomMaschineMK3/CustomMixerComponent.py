@@ -61,15 +61,18 @@ class CustomMixerComponent(MixerComponent, Renderable):
     _control_index = 0
     _control_count = 1
     _track_count = 0
+    _track_index = None
     _display_names = ["Pan"] + ["Send " + chr(ord('A') + index) for index in range(MAX_NUM_SENDS)]
 
-    @depends(session_ring = None, show_message = None)
-    def __init__(self, name = "Mixer", session_ring = None, show_message = None, *a, **k):
+    @depends(session_ring = None, show_message = None, track_index = None)
+    def __init__(self, name = "Mixer", session_ring = None, show_message = None, track_index = None, *a, **k):
         super().__init__(name, session_ring = session_ring, *a, **k)
         self._on_return_tracks_changed.subject = self.song
         self._on_return_tracks_changed()
         self._track_count = session_ring.num_tracks
         self._show_message = show_message
+        self._track_index = track_index
+        self._on_track_states_changed.subject = self._track_index
 
     def set_pan_or_send_controls(self, controls):
         self.pan_or_send_controls.set_control_element(controls)
@@ -141,35 +144,55 @@ class CustomMixerComponent(MixerComponent, Renderable):
                 if liveobj_valid(parameter) and not parameter.is_quantized:
                     parameter.value = parameter.default_value
 
+    @listenable_property
+    def track_states(self):
+        # Short summary for display like "S3 M1", empty if nothing is soloed or muted
+        states = []
+        if self._track_index.solo_count > 0:
+            states.append(f"S{self._track_index.solo_count}")
+        if self._track_index.mute_count > 0:
+            states.append(f"M{self._track_index.mute_count}")
+        return " ".join(states)
+
     @clear_all_solo_button.pressed
     def _on_clear_all_solo_pressed(self, button):
-        for track in self.song.visible_tracks:
-            if track.solo:
-                track.solo = False
+        for track in self._track_index.soloed_tracks():
+            track.solo = False
 
     @clear_all_mute_button.pressed
     def _on_clear_all_mute_pressed(self, button):
-        for track in self.song.visible_tracks:
-            if track.mute:
-                track.mute = False
+        for track in self._track_index.muted_tracks():
+            track.mute = False
+
+    @listens("track_states")
+    def _on_track_states_changed(self):
+        self.notify_track_states()
 
     def _update_control_mapped_parameter(self, index):
+        # Assigning mapped parameter makes Live rebuild MIDI mappings,
+        # so only controls whose target parameter is changed are reassigned.
         map_range = range(min(self._track_count, self.pan_or_send_controls.control_count))
         logger.info(f"current control index = {index}")
-        if index == 0:
-            for track_index in map_range:
-                track = self.channel_strip(track_index).track
-                if liveobj_valid(track):
-                    self.pan_or_send_controls[track_index].mapped_parameter = track.mixer_device.panning
-                else:
-                    self.pan_or_send_controls[track_index].mapped_parameter = None
-        else:
-            for track_index in map_range:
-                track = self.channel_strip(track_index).track                
-                if liveobj_valid(track) and len(track.mixer_device.sends) > index - 1:
-                    self.pan_or_send_controls[track_index].mapped_parameter = track.mixer_device.sends[index - 1]
-                else:
-                    self.pan_or_send_controls[track_index].mapped_parameter = None
+        changed_count = 0
+        for track_index, parameter in zip(map_range, self._target_parameters(index, map_range)):
+            control = self.pan_or_send_controls[track_index]
+            if control.mapped_parameter != parameter:
+                control.mapped_parameter = parameter
+                changed_count += 1
+
+        logger.debug(f"Reassigned {changed_count} pan / send controls")
+
+    def _target_parameters(self, index, map_range):
+        for track_index in map_range:
+            track = self.channel_strip(track_index).track
+            if not liveobj_valid(track):
+                yield None
+            elif index == 0:
+                yield track.mixer_device.panning
+            elif len(track.mixer_device.sends) > index - 1:
+                yield track.mixer_device.sends[index - 1]
+            else:
+                yield None
 
     def _show_current_control_name(self):
         self._show_message(f"Mixer Control Select: {self._display_names[self.control_index]}")
@@ -8,10 +8,9 @@
 #
 # ==================================================
 
-from faulthandler import is_enabled
 from math import inf
 from Live.Clip import MidiNoteSpecification, GridQuantization # type: ignore
-from ableton.v3.base import EventObject, clamp, depends, in_range, listenable_property, listens
+from ableton.v3.base import EventObject, clamp, depends, in_range, listenable_property, listens, task
 from ableton.v3.control_surface.components.note_editor import DEFAULT_STEP_TRANSLATION_CHANNEL
 from ableton.v3.live import liveobj_changed, liveobj_valid
 from ableton.v3.control_surface import Component
@@ -20,6 +19,8 @@ from ableton.v3.control_surface.display import Renderable
 from ableton.v3.control_surface.skin import LiveObjSkinEntry
 from ableton.v3.control_surface.components import NoteEditorComponent, StepSequenceComponent
 
+from .Logger import logger
+
 GRID_RESOLUTION_NAMES = {
     GridQuantization.g_thirtysecond: "1/32",
     GridQuantization.g_sixteenth: "1/16",
@@ -61,24 +62,82 @@ class CustomNoteEditorComponent(NoteEditorComponent):
     select_button = ButtonControl(color = None)
 
     _velocity_levels = None
+    _pending_clip = None
+    _pending_notes = []
 
     def __init__(self, name = "Note_Editor", *a, **k):
         super().__init__(name, *a, **k)
+        self._pending_notes = []
+        self._flush_task = self._tasks.add(task.sequence(task.delay(1), task.run(self._flush_pending_notes)))
+        self._flush_task.kill()
 
     def set_velocity_levels(self, velocity_levels):
         self._velocity_levels = velocity_levels
 
     def _add_new_note_in_step(self, pitch, time):
         #return super()._add_new_note_in_step(pitch, time)
-        velocity = 127 if self._full_velocity.enabled else self._get_current_velocity()
+        # Adding notes one by one makes two round-trips to Live and one undo point per step.
+        # Buffer notes entered within the same tick and commit them with a single add_new_notes call.
+        if liveobj_changed(self._pending_clip, self._clip):
+            self._flush_pending_notes()
+
+        velocity = self.current_velocity
         note = MidiNoteSpecification(
             pitch = pitch,
             start_time = time,
             duration = self.step_length,
             velocity = velocity,
             mute = False)
-        self._clip.add_new_notes((note,))
-        self._clip.deselect_all_notes()
+        self._pending_clip = self._clip
+        self._pending_notes.append(note)
+        self._flush_task.restart()
+
+        # Show buffered notes immediately, clip notes listener will replace them after commit
+        self._clip_notes = list(self._clip_notes) + [note]
+        self._update_editor_matrix()
+
+    def _flush_pending_notes(self):
+        self._flush_task.kill()
+        clip = self._pending_clip
+        notes = self._pending_notes
+        self._pending_clip = None
+        self._pending_notes = []
+
+        if liveobj_valid(clip) and len(notes) > 0:
+            logger.debug(f"Commit {len(notes)} step notes")
+            clip.add_new_notes(tuple(notes))
+            clip.deselect_all_notes()
+
+    def _remove_pending_notes_in_step(self, step):
+        # Pressing a step again before commit removes buffered notes only, they don't exist in clip yet
+        step_notes = step.filter_notes(self._pending_notes)
+        if len(step_notes) > 0:
+            self._pending_notes = [note for note in self._pending_notes if note not in step_notes]
+            self._clip_notes = [note for note in self._clip_notes if note not in step_notes]
+            self._update_editor_matrix()
+            return True
+
+        return False
+
+    @property
+    def current_velocity(self):
+        return 127 if self._full_velocity.enabled else self._get_current_velocity()
+
+    def visible_step_times(self):
+        return [step.start for step in self._visible_steps()]
+
+    def replace_notes_in_range(self, pitch, start_time, length, notes):
+        # Replace all notes of pitch in range with notes, used for committing generated patterns
+        self._flush_pending_notes()
+        if self.is_enabled() and self._has_clip() and self._can_edit():
+            self._clip.remove_notes_extended(
+                from_pitch = pitch,
+                pitch_span = 1,
+                from_time = start_time,
+                time_span = length)
+            if len(notes) > 0:
+                self._clip.add_new_notes(notes)
+            self._clip.deselect_all_notes()
 
     def _get_current_velocity(self):
         if self._velocity_levels != None:
@@ -88,17 +147,35 @@ class CustomNoteEditorComponent(NoteEditorComponent):
         
     def _on_pad_released(self, pad, **k):
         if self.select_button.is_pressed:
+            self._flush_pending_notes()
             if self.is_enabled() and self._has_clip() and self._can_edit() and self._can_press_or_release_step(pad):
                 row, column = pad.coordinate
                 index = row * self.matrix.width + column
-                visible_steps = self._visible_steps()
-                step_notes = visible_steps[index].filter_notes(self._clip_notes)
+                step = self._visible_steps()[index]
+                # Notes shown in editor may still be buffered specifications without note ID,
+                # so notes of the step are read again from clip after committing them
+                clip_notes = self._clip.get_notes_extended(
+                    from_pitch = 0,
+                    pitch_span = 128,
+                    from_time = step.start,
+                    time_span = self.step_length)
+                step_notes = step.filter_notes(clip_notes)
                 self._clip.select_notes_by_id([note.note_id for note in step_notes])
             k["can_add_or_remove"] = False
+        elif len(self._pending_notes) > 0 and self._can_press_or_release_step(pad):
+            row, column = pad.coordinate
+            index = row * self.matrix.width + column
+            if self._remove_pending_notes_in_step(self._visible_steps()[index]):
+                k["can_add_or_remove"] = False
         
         super()._on_pad_released(pad, **k)
     
     @select_button.double_clicked
     def _on_select_button_double_clicked(self, button):
+        self._flush_pending_notes()
         if self.is_enabled() and self._has_clip() and self._can_edit():
             self._clip.deselect_all_notes()
+
+    def disconnect(self):
+        self._flush_pending_notes()
+        super().disconnect()
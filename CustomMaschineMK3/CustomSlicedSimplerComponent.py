@@ -17,14 +17,17 @@ from ableton.v3.control_surface.controls import (
     PlayableControl,
     control_list
 )
-from ableton.v3.control_surface.skin import LiveObjSkinEntry
 
 from .Logger import logger
 from .ClipNotesSelectMixin import ClipNotesSelectMixin
+from .LedColorCacheMixin import LedColorCacheMixin
 
-class CustomSlicedSimplerComponent(ClipNotesSelectMixin, SlicedSimplerComponent):
+SLICES_PER_GROUP = 16
+ROWS_PER_GROUP = 4
+
+class CustomSlicedSimplerComponent(ClipNotesSelectMixin, LedColorCacheMixin, SlicedSimplerComponent):
     _select_buttons = control_list(ButtonControl, control_count = 4, color = None)
-    _has_slice_list = [False] * 4
+    _slice_count = 0
 
     def __init__(self, *a, **k):
         super().__init__(*a, **k, matrix_always_listenable = True)
@@ -38,7 +41,7 @@ class CustomSlicedSimplerComponent(ClipNotesSelectMixin, SlicedSimplerComponent)
     def _on_select_buttons_pressed(self, target_button):
         for button in self._select_buttons:
             if button == target_button:
-                self.position = button.index * 4
+                self.position = button.index * ROWS_PER_GROUP
                 logger.info(f"Slice group selected index = {button.index}")
 
     def _on_matrix_pressed(self, button):
@@ -46,38 +49,42 @@ class CustomSlicedSimplerComponent(ClipNotesSelectMixin, SlicedSimplerComponent)
         return super()._on_matrix_pressed(button)
 
     def set_simpler_device(self, simpler_device):
-        sample = self._simpler_device.sample if liveobj_valid(self._simpler_device) else None
-        self._on_slices_changed.subject = sample
         super().set_simpler_device(simpler_device)
-
-    def update(self):
-        self._update_slice_group()
-        super().update()
+        self._on_simpler_sample_changed.subject = self._simpler_device if liveobj_valid(self._simpler_device) else None
+        self._on_simpler_sample_changed()
 
     def _update_led_feedback(self):
         super()._update_led_feedback()
+        self._validate_led_cache(self._target_track.target_track)
+        # Visible window is 4 rows from position, each group also covers 4 rows
+        position = self.position
         for button in self._select_buttons:
-            if self._has_slice_list[button.index]:
+            if self._slice_count > button.index * SLICES_PER_GROUP:
                 new_color = "SlicedSimpler.GroupHasSlice"
             else:
                 new_color = "SlicedSimpler.Group"
 
-            start_position = button.index * 4
-            intersects = any([pos >= start_position and pos < start_position + 4 for pos in [self.position, self.position + 3]])
-            if intersects:
+            start_position = button.index * ROWS_PER_GROUP
+            if start_position - ROWS_PER_GROUP < position < start_position + ROWS_PER_GROUP:
                 new_color += "Selected"
 
-            button.color = LiveObjSkinEntry(new_color, self._target_track.target_track)
+            self._set_led_color(button, new_color)
 
     def _update_button_color(self, button):
-        super()._update_button_color(button)
-        button.pressed_color = LiveObjSkinEntry("SlicedSimpler.SlicePressed", self._target_track.target_track)
+        self._validate_led_cache(self._target_track.target_track)
+        self._set_recorded_led_color(button, super()._update_button_color, "SlicedSimpler.SlicePressed")
 
     def _update_slice_group(self):
-        slices = self._slices()
-        logger.debug(f"Update slice group slices = {slices}, length = {len(slices)}")
-        for index in range(self._select_buttons.control_count):
-            self._has_slice_list[index] = len(slices) > index * 16
+        # Groups are fixed runs of 16 slices, so slice count is all we need for occupancy
+        self._slice_count = len(self._slices())
+        logger.debug(f"Update slice group slice count = {self._slice_count}")
+
+    @listens("sample")
+    def _on_simpler_sample_changed(self):
+        sample = self._simpler_device.sample if liveobj_valid(self._simpler_device) else None
+        self._on_slices_changed.subject = sample
+        self._update_slice_group()
+        self._update_led_feedback()
 
     @listens("slices")
     def _on_slices_changed(self):
@@ -42,6 +42,7 @@ DEVICE_CONTROL = "device"
 CLIP_CONTROL = "clip"
 BROWSER = "browser"
 SETTINGS = "settings"
+SEARCH = "search"
 CUSTOM = "custom"
 
 def make_mcu_display_header(line):
@@ -200,12 +201,18 @@ class Notifications(DefaultNotifications):
         grid_resolution = "Step sequence grid\n{}".format
         grid_resolution: "Notification[Fn[str]]"
 
+    class PatternGenerator:
+        parameter = "Pattern {}\n{}".format
+        parameter: "Notification[Fn[str, str]]"
+
 def create_root_view():
     logger.info("Init display")
 
     def mixer_view(state, content):
         control_name = state.mixer.control_name
+        track_states = state.mixer.track_states
         content.lines[0] = f"Param:{control_name}"
+        content.lines[0] += track_states.rjust(LCD_LINE_LENGTH - len(content.lines[0]))
         content.lines[2] = "{:<6}|{:<6}|{:<6}|{:<6}".format(*[to_pan_or_send_value(knob) for knob in state.elements.knobs[:4]])
 
         content.lines[1] = f"{'Lock' if state.target_track.is_locked_to_track else 'Track'}:"
@@ -242,7 +249,14 @@ def create_root_view():
             launch_mode = adjust_string(LaunchModeList.to_string(clip.launch_mode), 6)
             quantize = ClipLaunchQuantizationList.to_string(clip.launch_quantization)
             #quantization = ClipLaunchQuantizationList.to_string(clip.launch_quantization)
-            if clip.is_audio_clip:
+            if state.clip_editor.warp_marker_page:
+                content.lines[0] = f"{name:<13}|Marker:{state.clip_editor.warp_marker_position}"
+                content.lines[1] = "Select|Move  |Ins/Del"
+                content.lines[2] = f"B:{state.clip_editor.warp_marker_beat_time:<11}|S:{state.clip_editor.warp_marker_sample_time}"
+                gain = adjust_gain_string(clip.gain_display_string)
+                pitch = f"{clip.pitch_coarse + clip.pitch_fine * 0.01:+.2f}st"
+                content.lines[3] = f"{gain:<6}|{pitch:>8}|{WarpModeList.to_string(clip.warp_mode):<8}"
+            elif clip.is_audio_clip:
                 content.lines[1] = f"{launch_mode:<6}|{quantize:<6}|Legato|Warp"
                 warp = WarpModeList.to_string(clip.warp_mode) if clip.warping else "No Warp"
                 pitch = f"{clip.pitch_coarse + clip.pitch_fine * 0.01:+.2f}st"
@@ -275,6 +289,16 @@ def create_root_view():
         content.lines[2] = f">{state.settings.current_value}"
         content.lines[3] = ""
 
+    def search_view(state, content):
+        search = state.name_search
+        # Letter under the cursor is already included in matches, so it's shown in brackets
+        candidate = f"[{search.candidate_letter.upper()}]" if search.candidate_letter else "_"
+        content.lines[0] = f"Find:{search.query.upper()}{candidate}"[-LCD_LINE_LENGTH:]
+        more = "+" if search.has_more_matches else ""
+        content.lines[1] = f"{search.match_count}{more} match{'es' if search.match_count != 1 else ''}"
+        content.lines[2] = f">{search.match_name[:LCD_LINE_LENGTH - 1]}" if search.match_count > 0 else NO_ITEM
+        content.lines[3] = f" {search.next_match_name[:LCD_LINE_LENGTH - 1]}"
+
     def custom_view(state, content):
         page = state.pageable_background.page_index
         content.lines[0] = f"Page:{page + 1}"
@@ -308,7 +332,11 @@ def create_root_view():
             clip = state.target_track.target_clip
             index = TOUCH_STATES.active_index
             if liveobj_valid(clip):
-                if clip.looping:
+                if state.clip_editor.warp_marker_page:
+                    if index in (0, 1, 2):
+                        content.lines[0] = f"Warp marker {state.clip_editor.warp_marker_position}"
+                        content.lines[2] = f"{state.clip_editor.warp_marker_beat_time}|{state.clip_editor.warp_marker_sample_time}"
+                elif clip.looping:
                     if index == 0:
                         content.lines[0] = "Loop start"
                         content.lines[2] = f"{state.clip_editor.loop_offset}"
@@ -370,6 +398,8 @@ def create_root_view():
             browser_view(state, content)
         elif display_mode == SETTINGS:
             settings_view(state, content)
+        elif display_mode == SEARCH:
+            search_view(state, content)
         elif display_mode == CUSTOM:
             custom_view(state, content)
 
@@ -50,7 +50,7 @@ class EncoderModeControlComponent(Component):
         
         selected_mode = self._encoder_modes.selected_mode
         # In browser mode, encoder mode buttons do nothing to avoid confusing 
-        if selected_mode != "browser" and selected_mode != "settings":
+        if selected_mode not in ("browser", "settings", "search"):
             shift = self.shift_button.is_pressed
             if len(modes) > 1:
                 # If a mode button has two modes and press mode button with shift when non-shift mode is selected, don't return to default
@@ -88,6 +88,8 @@ class EncoderModeControlComponent(Component):
             self._encoder_modes.selected_mode = "browser"
         elif display_mode == "settings":
             self._encoder_modes.selected_mode = "settings"
+        elif display_mode == "search":
+            self._encoder_modes.selected_mode = "search"
         else:
             if self._selected_encoder_mode != None:
                 self._encoder_modes.selected_mode = self._selected_encoder_mode
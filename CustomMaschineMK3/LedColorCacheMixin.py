@@ -0,0 +1,86 @@
+# ==================================================
+#
+# This file is part of CustomMaschineMK3.
+# CustomMaschineMK3 is free software licensed under GPL-3.0.
+# For more details, see "LICENSE" file.
+#
+# Copyright (C) 2024-2025 chiaki
+#
+# ==================================================
+
+from ableton.v3.control_surface.skin import LiveObjSkinEntry
+from ableton.v3.live import liveobj_changed, liveobj_valid
+
+from .ColorSkin import element_color_key
+
+# Stands in for a pad while framework component picks its color.
+# Attribute reads go to the pad itself, assigned color is only recorded.
+class PadColorRecorder():
+    def __init__(self, button):
+        object.__setattr__(self, "_button", button)
+        object.__setattr__(self, "color", None)
+
+    def __getattr__(self, name):
+        return getattr(self._button, name)
+
+    def __setattr__(self, name, value):
+        if name == "color":
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._button, name, value)
+
+# Remembers skin color name last assigned to each button.
+# Colors are sent only to buttons whose color name is changed,
+# and skin entries are shared between buttons instead of creating new one for each assignment.
+# Cache is cleared when colored object (usually target track) or its color is changed.
+# Color is compared by RGB value when RGB color mapping is enabled, otherwise by color index.
+class LedColorCacheMixin():
+    _led_liveobj = None
+    _led_color_key = None
+    _led_colors = None
+    _led_pressed_colors = None
+    _led_skin_entries = None
+
+    def _validate_led_cache(self, liveobj):
+        color_key = element_color_key(liveobj) if liveobj_valid(liveobj) else None
+        if self._led_colors == None or liveobj_changed(liveobj, self._led_liveobj) or color_key != self._led_color_key:
+            self._led_liveobj = liveobj
+            self._led_color_key = color_key
+            self._led_colors = {}
+            self._led_pressed_colors = {}
+            self._led_skin_entries = {}
+
+    def _invalidate_led_cache(self):
+        self._led_colors = None
+
+    def _led_skin_entry(self, color_name):
+        entry = self._led_skin_entries.get(color_name)
+        if entry == None:
+            entry = LiveObjSkinEntry(color_name, self._led_liveobj)
+            self._led_skin_entries[color_name] = entry
+        return entry
+
+    def _set_led_color(self, button, color_name, pressed_color_name = None):
+        # Call _validate_led_cache() before using this
+        if self._led_colors.get(button) != color_name:
+            self._led_colors[button] = color_name
+            button.color = self._led_skin_entry(color_name)
+        self._set_led_pressed_color(button, pressed_color_name)
+
+    def _set_led_pressed_color(self, button, pressed_color_name):
+        if pressed_color_name != None and self._led_pressed_colors.get(button) != pressed_color_name:
+            self._led_pressed_colors[button] = pressed_color_name
+            button.pressed_color = self._led_skin_entry(pressed_color_name)
+
+    def _set_recorded_led_color(self, button, update_button_color, pressed_color_name = None):
+        # Call _validate_led_cache() before using this
+        # Color picked by update_button_color() is sent through cache if it's a skin color name.
+        # Other values may be bound to objects whose color isn't tracked here, so they are always sent.
+        recorder = PadColorRecorder(button)
+        update_button_color(recorder)
+        if isinstance(recorder.color, str):
+            self._set_led_color(button, recorder.color, pressed_color_name)
+        else:
+            self._led_colors.pop(button, None)
+            button.color = recorder.color
+            self._set_led_pressed_color(button, pressed_color_name)
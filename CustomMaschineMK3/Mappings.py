@@ -145,6 +145,14 @@ def create_mappings(surface):
         settings = dict(
             component = "Settings",
             select_encoder = "encoder"),
+        search = dict(
+            component = "Name_Search",
+            select_encoder = "encoder",
+            add_letter_button = "encoderpush",
+            delete_letter_button = "encoderleft",
+            jump_button = "encoderright",
+            prev_match_button = "encoderup",
+            next_match_button = "encoderdown"),
     )
 
     mappings["Encoder_Mode_Control"] = dict(
@@ -184,10 +192,12 @@ def create_mappings(surface):
     mappings["Pad_Modes"] = dict(
         default_behaviour = LatchingBehaviour(),
         default_button = "padmode",
+        session_overview_button = "padmode_with_shift",
         keyboard_button = None,
         drum_rack_button = None,
         simpler_button = None,
         chord_button = "chords",
+        chord_pads_button = "chords_with_shift",
         step_button = "step",
         default = dict(
             modes = [
@@ -205,6 +215,9 @@ def create_mappings(surface):
                     fixed_button = "pattern",
                     length_select_buttons = "group_buttons_with_pattern"),
             ]),
+        session_overview = dict(
+            component = "Session_Block_Overview",
+            block_buttons = "pads"),
         keyboard = dict(
             modes = [
                 dict(component = "Maschine_Playable",
@@ -270,15 +283,32 @@ def create_mappings(surface):
                     length_select_buttons = "group_buttons_with_pattern"),
             ]
         ),
+        chord_pads = dict(
+            modes = [
+                dict(component = "Chord_Pads",
+                    matrix = "pads"),
+                dict(component = "View_Based_Recording",
+                    fixed_button = "pattern",
+                    length_select_buttons = "group_buttons_with_pattern"),
+            ]
+        ),
         step = dict(
-            component = "Step_Sequence",
-            step_buttons = "pads" if sequencer_style == "Push" else "original_order_pads",
-            resolution_buttons = "group_buttons_with_pattern",
-            loop_copy_button = "duplicate",
-            loop_delete_button = "erase",
-            prev_page_button = "row0_pads_with_shift_raw[2]",
-            next_page_button = "row0_pads_with_shift_raw[3]",
-            select_button = "select",
+            modes = [
+                dict(component = "Step_Sequence",
+                    step_buttons = "pads" if sequencer_style == "Push" else "original_order_pads",
+                    resolution_buttons = "group_buttons_with_pattern",
+                    loop_copy_button = "duplicate",
+                    loop_delete_button = "erase",
+                    prev_page_button = "row0_pads_with_shift_raw[2]",
+                    next_page_button = "row0_pads_with_shift_raw[3]",
+                    select_button = "select"),
+                dict(component = "Pattern_Generator",
+                    preview_buttons = "pads_with_events",
+                    parameter_encoders = "knobs_with_events",
+                    commit_button = "encoderpush_with_events"),
+                dict(component = "Clip_Overview",
+                    region_buttons = "pads_with_pattern"),
+            ]
         ),
     )
 
@@ -303,6 +333,14 @@ def create_mappings(surface):
             component = "Velocity_Levels",
             # No mapping, just placeholder
         ),
+        chord_pads = dict(
+            component = "Chord_Pads",
+            option_buttons = "group_buttons",
+        ),
+        session_overview = dict(
+            component = "Session_Overview",
+            matrix = "group_buttons",
+        ),
         step = dict(
             component = "Step_Sequence",
             loop_buttons = "group_buttons",
@@ -320,6 +358,7 @@ def create_mappings(surface):
         clip_button = "sampling",
         browser_button = "browser",
         settings_button = "setting",
+        search_button = "mixer_with_shift",
         custom_button = "channel",
         default = dict(
             component = "Mixer",
@@ -360,6 +399,7 @@ def create_mappings(surface):
             mute_button = "track_buttons_raw[0]",
             loop_button = "track_buttons_raw[1]",
             crop_button = "track_buttons_raw[2]",
+            warp_marker_button = "track_buttons_raw[3]",
             launch_mode_button = "track_buttons_raw[4]",
             launch_quantize_button = "track_buttons_raw[5]",
             legato_button = "track_buttons_raw[6]",
@@ -380,6 +420,10 @@ def create_mappings(surface):
             component = "Settings",
             value_encoder = "knobs_raw[0]"
         ),
+        search = dict(
+            behaviour = ToggleBehaviour(),
+            component = "Name_Search"
+        ),
         custom = dict(
             component = "Pageable_Background",
             user_buttons = "track_buttons",
@@ -414,6 +458,7 @@ def create_mappings(surface):
     )
 
     mappings["Selected_Parameter"] = dict(
+        pressure_encoders = "pad_pressures",
         reset_value_button = "mod_with_erase",
         select_modifier = "mod"
     )
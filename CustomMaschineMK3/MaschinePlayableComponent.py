@@ -8,7 +8,10 @@
 #
 # ==================================================
 
+from bisect import bisect_left
+from functools import lru_cache
 from itertools import product
+from time import monotonic
 from ableton.v3.control_surface.components import (
     PlayableComponent,
     PageComponent,
@@ -43,10 +46,9 @@ from ableton.v3.base import (
     task
 )
 
-from ableton.v3.control_surface.skin import LiveObjSkinEntry
-
 from .Logger import logger
 from .ClipNotesSelectMixin import ClipNotesSelectMixin
+from .LedColorCacheMixin import LedColorCacheMixin
 
 MODE_PLAYABLE = 0
 MODE_LISTENABLE = 1
@@ -54,13 +56,112 @@ MODE_PLAYABLE_LISTENABLE = 2
 
 SELECT_PITCH_DELAY = 0.25
 DEFAULT_NOTE_TRANSLATION_CHANNEL = 9
+KEYBOARD_LAYOUT_CACHE_SIZE = 32
+NOTE_TRANSLATION_CACHE_SIZE = 256
+# Touch strip sends 14bit pitch bend, pedals send 7bit values
+TOUCHSTRIP_MIN_INTERVAL = 0.02
+TOUCHSTRIP_MIN_DELTA = 64
+PEDAL_MIN_INTERVAL = 0.02
+PEDAL_MIN_DELTA = 1
+
+# Everything derived from scale settings, shared between keyboard instances and never modified after creation.
+# Browsing scales with encoder revisits same layouts often, so they are cached by get_keyboard_layout().
+class KeyboardLayout:
+    __slots__ = (
+        "root_note",
+        "intervals",
+        "scale_mode",
+        "available_notes",
+        "scale_notes",
+        "octave_root_notes",
+        "octave_notes_count",
+        "first_root_note_index",
+        "total_position_count",
+        "page_length",
+        "note_colors",
+        "_scale_note_set",
+        "_root_note_set",
+        "_note_indices",
+    )
+
+    def __init__(self, root_note, intervals, scale_mode):
+        self.root_note = root_note
+        self.intervals = intervals
+        self.scale_mode = scale_mode
+
+        octaves = range(root_note - 12, 12 * 11 + root_note, 12)
+        self.octave_root_notes = tuple(note for note in octaves if 0 <= note < 128)
+        self.scale_notes = tuple(sorted(set(octave + interval for octave in octaves for interval in intervals if 0 <= octave + interval < 128)))
+        self.available_notes = self.scale_notes if scale_mode else tuple(range(128))
+        self.octave_notes_count = len(intervals)
+        self.page_length = self.octave_notes_count if scale_mode else 12
+
+        self._scale_note_set = frozenset(self.scale_notes)
+        self._root_note_set = frozenset(self.octave_root_notes)
+        self._note_indices = {note: index for index, note in enumerate(self.available_notes)}
+
+        self.first_root_note_index = self._note_indices[self.octave_root_notes[0]]
+        # Add shortage of highest octave for mapping first pad note to highest root note.
+        self.total_position_count = self._note_indices[self.octave_root_notes[-1]] + self.page_length
+
+        # Skin color name of each note in available notes
+        self.note_colors = tuple(self._color_for_note(note) for note in self.available_notes)
+
+    def _color_for_note(self, note):
+        if note in self._root_note_set:
+            return "Keyboard.RootNote"
+        elif note in self._scale_note_set:
+            return "Keyboard.ScaleNote"
+        else:
+            return "Keyboard.Note"
+
+    def is_root_note(self, note):
+        return note in self._root_note_set
+
+    def is_scale_note(self, note):
+        return note in self._scale_note_set
+
+    def index_of(self, note):
+        return self._note_indices.get(note, -1)
+
+    def nearest_note(self, target_note, root_note_only = False):
+        # Lower note wins when 2 notes have same distance
+        notes = self.octave_root_notes if root_note_only else self.available_notes
+        index = bisect_left(notes, target_note)
+        if index == 0:
+            return notes[0]
+        elif index == len(notes):
+            return notes[-1]
+
+        lower = notes[index - 1]
+        upper = notes[index]
+        return upper if upper - target_note < target_note - lower else lower
+
+@lru_cache(maxsize = KEYBOARD_LAYOUT_CACHE_SIZE)
+def get_keyboard_layout(root_note, intervals, scale_mode):
+    logger.debug(f"Create keyboard layout root = {root_note}, intervals = {intervals}, scale mode = {scale_mode}")
+    return KeyboardLayout(root_note, intervals, scale_mode)
+
+@lru_cache(maxsize = NOTE_TRANSLATION_CACHE_SIZE)
+def get_note_translations(layout, position, pad_count, channel):
+    # (note, channel) of each pad, indexed from bottom left pad
+    # Pads beyond highest note use next channel for not sounding duplicated notes
+    notes = layout.available_notes
+    last_index = len(notes) - 1
+    return tuple(
+        (notes[min(position + pad_index, last_index)], channel + (0 if position + pad_index <= last_index else 1))
+        for pad_index in range(pad_count))
 
 # This control class is just for bypass pitch bend message
+# In playable mode (default) values never reach the script, so there's nothing to decimate.
+# Only after set_mode() selects a listenable mode, values reaching the script are decimated.
+# A value is passed through only if min_interval seconds passed and it moved min_delta or more since last passed value,
+# otherwise latest value is held and sent when interval expires, so the final position is never lost.
 class PlayableEncoderControl(SendValueEncoderControl):
 
     class State(SendValueEncoderControl.State):
 
-        def __init__(self, mode = None, *a, **k):
+        def __init__(self, mode = None, min_interval = 0.0, min_delta = 0, *a, **k):
             super().__init__(*a, **k)
             self._enabled = True
             self._mode = MODE_PLAYABLE if mode == None else mode
@@ -68,7 +169,18 @@ class PlayableEncoderControl(SendValueEncoderControl):
                 MODE_PLAYABLE: ScriptForwarding.none, 
                 MODE_LISTENABLE: ScriptForwarding.exclusive, 
                 MODE_PLAYABLE_LISTENABLE: ScriptForwarding.non_consuming}
-            
+            self._min_interval = min_interval
+            self._min_delta = min_delta
+            self._last_sent_value = None
+            self._last_sent_time = 0.0
+            self._pending_value = None
+            self.events_in = 0
+            self.events_out = 0
+            self._pending_task = self.tasks.add(task.sequence(task.wait(max(min_interval, 0.0)), task.run(self._send_pending_value)))
+            self._pending_task.kill()
+            self._is_decimating = False
+            self._update_decimation()
+
 
         def set_control_element(self, control_element):
             logger.info(f"set_control_element element = {control_element}")
@@ -86,32 +198,77 @@ class PlayableEncoderControl(SendValueEncoderControl):
         def set_mode(self, value):
             self._mode = value
             self._update_script_forwarding()
+            self._update_decimation()
+
+        def _update_decimation(self):
+            self._is_decimating = self._mode != MODE_PLAYABLE
+            if not self._is_decimating:
+                self._pending_task.kill()
+                self._pending_value = None
+                self._last_sent_value = None
 
         def _notifications_enabled(self):
             return super()._notifications_enabled()
         
         def _notify_encoder_value(self, value, *a, **k):
+            if not self._is_decimating:
+                self._forward_value(value)
+                return
+
+            self.events_in += 1
+            if self._can_send_now(value):
+                self._pending_task.kill()
+                self._pending_value = None
+                self._send_value(value)
+            else:
+                # Last value wins, older held value is simply replaced
+                self._pending_value = value
+                if not self._pending_task.is_running:
+                    self._pending_task.restart()
+
+        def _can_send_now(self, value):
+            if self._last_sent_value == None:
+                return True
+            if monotonic() - self._last_sent_time < self._min_interval:
+                return False
+            return abs(value - self._last_sent_value) >= self._min_delta
+
+        def _send_value(self, value):
+            self._last_sent_value = value
+            self._last_sent_time = monotonic()
+            self.events_out += 1
+            self._forward_value(value)
+
+        def _forward_value(self, value):
             self._call_listener("value", value)
             self.connected_property_value = value
 
+        def _send_pending_value(self):
+            if self._pending_value != None:
+                value = self._pending_value
+                self._pending_value = None
+                self._send_value(value)
 
-class MaschinePlayableComponent(PlayableComponent, PageComponent, ClipNotesSelectMixin, Pageable, PitchProvider, Renderable):
+        def reset_value(self, value):
+            # Used when another control resets this one, held value is dropped and reset value is sent without decimation
+            if not self._is_decimating:
+                self._forward_value(value)
+                return
+
+            self._pending_task.kill()
+            self._pending_value = None
+            self._send_value(value)
+
+
+class MaschinePlayableComponent(PlayableComponent, PageComponent, ClipNotesSelectMixin, LedColorCacheMixin, Pageable, PitchProvider, Renderable):
     octave_select_buttons = control_matrix(ButtonControl)
-    pitchbend_encoder = PlayableEncoderControl()
+    pitchbend_encoder = PlayableEncoderControl(min_interval = TOUCHSTRIP_MIN_INTERVAL, min_delta = TOUCHSTRIP_MIN_DELTA)
+    # Snap-back value must be exact, so reset is never decimated
     pitchbend_reset = PlayableEncoderControl()
-    pedal_tip_encoder = PlayableEncoderControl()
-    pedal_ring_encoder = PlayableEncoderControl()
-
-    _scale_notes_only = False
-    _root_note = 0
-    _intervals = list(range(0, 12))
-    _octave_root_notes = list(range(0, 128, 12))
-    _octave_notes_count = 12
-    _all_scale_notes = list(range(128))
-    _all_chromatic_scale_notes = list(range(128))
-    _first_root_note_index = 0
-    # Add shortage of highest octave for mapping first pad note to highest root note. 
-    _total_position_count = _octave_root_notes[-1] + _octave_notes_count
+    pedal_tip_encoder = PlayableEncoderControl(min_interval = PEDAL_MIN_INTERVAL, min_delta = PEDAL_MIN_DELTA)
+    pedal_ring_encoder = PlayableEncoderControl(min_interval = PEDAL_MIN_INTERVAL, min_delta = PEDAL_MIN_DELTA)
+
+    _layout = get_keyboard_layout(0, tuple(range(12)), False)
 
     _select_start_octave = 2
     _position = 60
@@ -124,7 +281,7 @@ class MaschinePlayableComponent(PlayableComponent, PageComponent, ClipNotesSelec
     # Override Pageable class member
     @property
     def position_count(self):
-        return self._total_position_count
+        return self._layout.total_position_count
 
     @property
     def position(self):
@@ -140,18 +297,15 @@ class MaschinePlayableComponent(PlayableComponent, PageComponent, ClipNotesSelec
     
     @property
     def page_offset(self):
-        return self._first_root_note_index
+        return self._layout.first_root_note_index
         
     @property
     def page_length(self):
-        return self._octave_notes_count if self._scale_notes_only else 12
+        return self._layout.page_length
 
     @property
     def available_notes(self):
-        if self._scale_notes_only:
-            return self._all_scale_notes
-        else:
-            return self._all_chromatic_scale_notes
+        return self._layout.available_notes
 
     @depends(target_track = None)
     def __init__(self, name = "Maschine_Playable", translation_channel = DEFAULT_NOTE_TRANSLATION_CHANNEL, matrix_always_listenable = True, target_track = None, *a, **k):
@@ -183,6 +337,11 @@ class MaschinePlayableComponent(PlayableComponent, PageComponent, ClipNotesSelec
         if matrix != None:
             self._update_led_feedback()
 
+    @pitchbend_reset.value
+    def _on_pitchbend_reset_value(self, value, _):
+        # Touch strip cap sends center value when finger is released, it's passed to pitch bend listeners as is
+        self.pitchbend_encoder.reset_value(value)
+
     def set_scale_system(self, scale_system):
         self._scale_system = scale_system
         self._scale_mode_changed.subject = scale_system
@@ -195,6 +354,15 @@ class MaschinePlayableComponent(PlayableComponent, PageComponent, ClipNotesSelec
         self._adjust_position(first_pad_note)
         self._update_led_feedback()
 
+    def disconnect(self):
+        encoders = (
+            ("Pitch bend", self.pitchbend_encoder),
+            ("Pedal tip", self.pedal_tip_encoder),
+            ("Pedal ring", self.pedal_ring_encoder))
+        for name, encoder in encoders:
+            logger.info(f"{name} events in = {encoder.events_in}, out = {encoder.events_out}")
+        super().disconnect()
+
     def _delayed_select_pitch(self):
         self._select_pitch_task.kill()
         self.pitches = [self._last_played_note]
@@ -215,40 +383,44 @@ class MaschinePlayableComponent(PlayableComponent, PageComponent, ClipNotesSelec
         super()._on_matrix_released(button)
         self._update_button_color(button)
 
+    def _current_note_translations(self):
+        return get_note_translations(self._layout, self.position, self.width * self.height, self._translation_channel)
+
     def _note_translation_for_button(self, button):
         row, column = button.coordinate
         inverted_row = self.height - row - 1
-        pad_index = inverted_row * self.width + column
-        notes = self.available_notes
-        target_note = notes[min(self.position + pad_index, len(notes) - 1)]
-        channel = self._translation_channel + (0 if self.position + pad_index < len(notes) else 1)
-        return (target_note, channel)
+        return self._current_note_translations()[inverted_row * self.width + column]
         #return super()._note_translation_for_button(button)
+
+    def _set_button_control_properties(self, button):
+        # Send translation only when it's different from the one already set to the pad
+        translation = self._note_translation_for_button(button)
+        if (button.identifier, button.channel) != translation:
+            button.identifier, button.channel = translation
     
-    def _update_led_feedback(self):
+    def _update_button_color(self, button):
         notes = self.available_notes
-        selected_pitch = self.pitches[0] if len(self.pitches) > 0 else -1
+        row, column = button.coordinate
+        inverted_row = self.height - row - 1
+        note_index = self.position + (inverted_row * self.width + column)
+
+        new_color = "Keyboard.NoNote"
+        if note_index < len(notes):
+            if self.select_button.is_pressed and len(self.pitches) > 0 and notes[note_index] == self.pitches[0]:
+                new_color = "Keyboard.NoteSelected"
+            else:
+                new_color = self._layout.note_colors[note_index]
+
+        self._validate_led_cache(self._target_track.target_track)
+        self._set_led_color(button, new_color, "Keyboard.NotePressed")
+
+    def _update_led_feedback(self):
+        # Only pads whose color name is changed are sent to hardware
         for button in self.matrix:
-            row, column = button.coordinate
-            inverted_row = self.height - row - 1
-            note_index = self.position + (inverted_row * self.width + column)
-
-            new_color = "Keyboard.NoNote"
-            if note_index < len(notes):
-                note = notes[note_index]
-                if self.select_button.is_pressed and note == selected_pitch:
-                    new_color = "Keyboard.NoteSelected"
-                elif note in self._octave_root_notes:
-                    new_color = "Keyboard.RootNote"
-                elif note in self._all_scale_notes:
-                    new_color = "Keyboard.ScaleNote"
-                else:
-                    new_color = "Keyboard.Note"
-
-            button.color = LiveObjSkinEntry(new_color, self._target_track.target_track)
-            button.pressed_color = LiveObjSkinEntry("Keyboard.NotePressed", self._target_track.target_track)
-
-        selectable_octaves = self._octave_root_notes[self._select_start_octave : self._select_start_octave + self.octave_select_buttons.control_count]
+            self._update_button_color(button)
+
+        self._validate_led_cache(self._target_track.target_track)
+        selectable_octaves = self._layout.octave_root_notes[self._select_start_octave : self._select_start_octave + self.octave_select_buttons.control_count]
         first_note = self.available_notes[self.position]
         selected_index = -1
 
@@ -261,28 +433,21 @@ class MaschinePlayableComponent(PlayableComponent, PageComponent, ClipNotesSelec
             index = row * self.width + column
 
             if index == selected_index:
-                button.color = LiveObjSkinEntry("Keyboard.OctaveSelected", self._target_track.target_track)
+                self._set_led_color(button, "Keyboard.OctaveSelected")
             else:
-                button.color = LiveObjSkinEntry("Keyboard.Octave", self._target_track.target_track)
+                self._set_led_color(button, "Keyboard.Octave")
     
     @octave_select_buttons.pressed
     def _on_octave_select_buttons_pressed(self, target_button):
         for button in self.octave_select_buttons:
             if button == target_button:
                 row, column = button.coordinate
-                base_note = self._octave_root_notes[self._select_start_octave + row * self.width + column]
-                self.position = self._find_note_index(self.available_notes, base_note)
+                base_note = self._layout.octave_root_notes[self._select_start_octave + row * self.width + column]
+                self.position = self._layout.index_of(base_note)
 
     def _on_select_button_pressed(self):
         self._update_led_feedback()
 
-    def _find_note_index(self, note_list, target_note):
-        for index, note in enumerate(note_list):
-            if note == target_note:
-                return index
-
-        return -1
-    
     def _scale_root_note_changed(self):
         self._update_scale_and_adjust_position(True)
 
@@ -307,49 +472,27 @@ class MaschinePlayableComponent(PlayableComponent, PageComponent, ClipNotesSelec
         self._on_track_color_changed.subject = self._target_track.target_track
         self._update_led_feedback()
 
-    @listens("color_index")
+    # "color" changes with color index too, so it covers both LED color mappings
+    @listens("color")
     def _on_track_color_changed(self):
         self._update_led_feedback()
 
     def _update_scale_info(self):
-        scale_mode = self._scale_system.scale_mode if self._scale_system != None else False
-        scale_changed = False
-        if self._scale_notes_only != scale_mode or self._root_note != self.song.root_note or self._intervals != self.song.scale_intervals:
-            self._scale_notes_only = scale_mode
-            self._root_note = self.song.root_note
-            self._intervals = [note for note in self.song.scale_intervals]
-            self._all_scale_notes = []
-
-            octaves = [octave + self._root_note for octave in range(-12, 12 * 11, 12)]
-            self._octave_notes_count = len(self._intervals)
-
-            self._octave_root_notes = list(filter(lambda note: note >= 0 and note < 128, octaves))
-            
-            for octave in octaves:
-                octave_notes = filter(lambda note: note >= 0 and note < 128, (octave + interval for interval in self._intervals))
-                self._all_scale_notes += list(octave_notes)
-
-            self._first_root_note_index = self.available_notes.index(self._octave_root_notes[0])
-            self._total_position_count = self.available_notes.index(self._octave_root_notes[-1])
-            self._total_position_count += len(self._intervals) if self._scale_notes_only else 12
-
-            scale_changed = True
+        scale_mode = bool(self._scale_system.scale_mode) if self._scale_system != None else False
+        layout = get_keyboard_layout(self.song.root_note, tuple(self.song.scale_intervals), scale_mode)
+        scale_changed = layout is not self._layout
+        self._layout = layout
 
         if not scale_changed:
             logger.info("Scale unchanged")
 
-        logger.info(f"Scale Enabled = {scale_mode}, Root = {self.song.root_note}, Name = {self.song.scale_name}, Intervals = {[i for i in self.song.scale_intervals]}")
-        logger.debug(f"All scale notes = {self._all_scale_notes}")
-        logger.debug(f"Octave root notes = {self._octave_root_notes}")
+        logger.info(f"Scale Enabled = {scale_mode}, Root = {self.song.root_note}, Name = {self.song.scale_name}, Intervals = {layout.intervals}")
+        logger.debug(f"All scale notes = {layout.scale_notes}")
+        logger.debug(f"Octave root notes = {layout.octave_root_notes}")
 
         return scale_changed
 
     def _adjust_position(self, first_pad_note, root_note_only = False):
         # Adjust scroll position near to previous first pad note
-        nearest_note = 0
-
-        for note in (self._octave_root_notes if root_note_only else self.available_notes):
-            if abs(note - first_pad_note) < abs(nearest_note - first_pad_note):
-                nearest_note = note
-
-        self.position = self._find_note_index(self.available_notes, nearest_note)
+        nearest_note = self._layout.nearest_note(first_pad_note, root_note_only)
+        self.position = self._layout.index_of(nearest_note)
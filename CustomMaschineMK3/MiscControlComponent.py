@@ -11,7 +11,7 @@
 from ableton.v3.control_surface.component import Component
 from ableton.v3.control_surface.display import Renderable
 from ableton.v3.control_surface.controls import ButtonControl, StepEncoderControl
-from ableton.v3.base import sign
+from ableton.v3.base import depends, sign
 from .Logger import logger
 
 
@@ -25,25 +25,17 @@ class MiscControlComponent(Component):
     exclusive_arm_button = ButtonControl(color = None)
     arm_button = ButtonControl(color = None)
     _selected_track = None
+    _track_index = None
 
-    def __init__(self, name = "Misc_Control", *a, **k):
+    @depends(track_index = None)
+    def __init__(self, name = "Misc_Control", track_index = None, *a, **k):
         super().__init__(name, *a, **k)
+        self._track_index = track_index
 
     def _get_selected_track_info(self):
-        selected_track = self.song.view.selected_track
-
         # Return True if selected track is midi or audio track
         # If track is return or master track, return False
-        for index, track in enumerate(self.song.visible_tracks):
-            if track == selected_track:
-                return (True, index)
-        
-        for index, track in enumerate(self.song.return_tracks):
-            if track == selected_track:
-                return (False, index)
-
-        # This is master track
-        return (False, -1)            
+        return self._track_index.track_info(self.song.view.selected_track)
 
     @new_audio_or_return_track_button.pressed
     def _create_audio_track(self, button):
@@ -85,7 +77,8 @@ class MiscControlComponent(Component):
         direction = int(sign(value))
         is_normal, track_index = self._get_selected_track_info()
 
-        return_and_master_tracks = self.song.return_tracks + [self.song.master_track]
+        visible_tracks = self._track_index.visible_tracks
+        return_and_master_tracks = self._track_index.return_and_master_tracks
         if not is_normal and track_index == -1:
             track_index = len(return_and_master_tracks) - 1
 
@@ -93,13 +86,13 @@ class MiscControlComponent(Component):
 
         new_index = track_index + direction
 
-        logger.info(f"is_normal = {is_normal}, track_index = {track_index}, direction = {direction}, new_index = {new_index}, len(visible_tracks) = {len(self.song.visible_tracks)}")
+        logger.info(f"is_normal = {is_normal}, track_index = {track_index}, direction = {direction}, new_index = {new_index}, len(visible_tracks) = {len(visible_tracks)}")
 
         if is_normal:
-            if new_index >= 0 and new_index < len(self.song.visible_tracks):
+            if new_index >= 0 and new_index < len(visible_tracks):
                 # normal track -> normal track
-                new_selected_track = self.song.visible_tracks[new_index]
-            elif new_index == len(self.song.visible_tracks):
+                new_selected_track = visible_tracks[new_index]
+            elif new_index == len(visible_tracks):
                 # normal track -> reutrn / master track
                 new_selected_track = return_and_master_tracks[0]
 
@@ -109,7 +102,7 @@ class MiscControlComponent(Component):
                 new_selected_track = return_and_master_tracks[new_index]
             elif new_index < 0:
                 # return / master track -> normal track
-                new_selected_track = self.song.visible_tracks[-1]
+                new_selected_track = visible_tracks[-1]
 
         if new_selected_track is not None:
             self.song.view.selected_track = new_selected_track
@@ -119,8 +112,8 @@ class MiscControlComponent(Component):
         selected_track = self.song.view.selected_track
         selected_track.arm = not selected_track.arm
         if self.song.exclusive_arm:
-            for track in self.song.tracks:
-                if track.can_be_armed and track != selected_track:
+            for track in self._track_index.armed_tracks():
+                if track != selected_track:
                     track.arm = False
 
     @arm_button.pressed
@@ -0,0 +1,248 @@
+# ==================================================
+#
+# This file is part of CustomMaschineMK3.
+# CustomMaschineMK3 is free software licensed under GPL-3.0.
+# For more details, see "LICENSE" file.
+#
+# Copyright (C) 2024-2025 chiaki
+#
+# ==================================================
+
+from bisect import bisect_left, insort
+from ableton.v3.control_surface.component import Component
+from ableton.v3.control_surface.display import Renderable
+from ableton.v3.control_surface.controls import ButtonControl, StepEncoderControl
+from ableton.v3.base import listenable_property, listens, listens_group
+from ableton.v3.live import liveobj_valid
+
+from .Logger import logger
+
+SEARCH_LETTERS = "abcdefghijklmnopqrstuvwxyz0123456789 -"
+MAX_MATCHES = 64
+
+KIND_TRACK = 0
+KIND_SCENE = 1
+KIND_PREFIXES = ("T:", "S:")
+
+def name_words(name):
+    # Whole name and each word in it are searchable by prefix
+    folded = name.casefold()
+    words = [folded] + [word for word in folded.split()[1:]]
+    return tuple(dict.fromkeys(words))
+
+# Sorted list of (word, key) pairs, prefix search is a bisect followed by reading matching range.
+# Name changes remove old words and insert new ones, so no full rebuild happens on renaming.
+class NamePrefixIndex:
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._entries = []
+        self._words = {}
+
+    def set_name(self, key, name):
+        self.remove(key)
+        words = name_words(name)
+        for word in words:
+            insort(self._entries, (word, key))
+        self._words[key] = words
+
+    def remove(self, key):
+        entries = self._entries
+        for word in self._words.pop(key, ()):
+            index = bisect_left(entries, (word, key))
+            if index < len(entries) and entries[index] == (word, key):
+                del entries[index]
+
+    def search(self, prefix, limit = MAX_MATCHES):
+        entries = self._entries
+        keys = []
+        found = set()
+        index = bisect_left(entries, (prefix,))
+        while index < len(entries) and len(keys) < limit:
+            word, key = entries[index]
+            if not word.startswith(prefix):
+                break
+            if key not in found:
+                found.add(key)
+                keys.append(key)
+            index += 1
+        return keys
+
+class NameSearchComponent(Component, Renderable):
+    select_encoder = StepEncoderControl(num_steps = 64)
+    add_letter_button = ButtonControl(color = None)
+    delete_letter_button = ButtonControl(color = None)
+    prev_match_button = ButtonControl(color = None, repeat = True)
+    next_match_button = ButtonControl(color = None, repeat = True)
+    jump_button = ButtonControl(color = None)
+
+    _query = ""
+    # -1 means no candidate letter, matches follow query only
+    _letter_index = -1
+    _match_index = 0
+    # Matches are cut at MAX_MATCHES, this tells more matches exist
+    _has_more_matches = False
+
+    def __init__(self, name = "Name_Search", *a, **k):
+        super().__init__(name, *a, **k)
+        self._index = NamePrefixIndex()
+        self._tracks = ()
+        self._scenes = ()
+        self._matches = []
+        # Position of each track / scene, for finding entry of renamed item
+        self._positions = {KIND_TRACK: {}, KIND_SCENE: {}}
+        self._on_visible_tracks_changed.subject = self.song
+        self._on_scenes_changed.subject = self.song
+        self._rebuild_tracks()
+        self._rebuild_scenes()
+        self._update_matches()
+
+    @listenable_property
+    def query(self):
+        return self._query
+
+    @listenable_property
+    def candidate_letter(self):
+        return SEARCH_LETTERS[self._letter_index] if self._letter_index >= 0 else ""
+
+    @listenable_property
+    def match_count(self):
+        return len(self._matches)
+
+    @listenable_property
+    def has_more_matches(self):
+        return self._has_more_matches
+
+    @listenable_property
+    def match_name(self):
+        return self._match_name(self._match_index)
+
+    @listenable_property
+    def next_match_name(self):
+        return self._match_name(self._match_index + 1)
+
+    def _match_name(self, match_index):
+        if match_index < len(self._matches):
+            kind, position = self._matches[match_index]
+            item = self._item_for_key(kind, position)
+            if liveobj_valid(item):
+                return KIND_PREFIXES[kind] + item.name
+        return ""
+
+    def _item_for_key(self, kind, position):
+        items = self._tracks if kind == KIND_TRACK else self._scenes
+        return items[position] if position < len(items) else None
+
+    @select_encoder.value
+    def _on_select_encoder_value(self, value, encoder):
+        # Matches follow query plus letter under the cursor while turning
+        if self._letter_index >= 0:
+            start = self._letter_index
+        else:
+            # First turn selects first letter, or last one if turned left
+            start = -1 if value > 0 else 0
+        self._set_letter_index((start + value) % len(SEARCH_LETTERS))
+
+    @add_letter_button.pressed
+    def _on_add_letter_button_pressed(self, button):
+        if self._letter_index >= 0:
+            self._query += self.candidate_letter
+            self.notify_query()
+            self._set_letter_index(-1)
+
+    @delete_letter_button.pressed
+    def _on_delete_letter_button_pressed(self, button):
+        # Candidate letter is dropped first, then letters of query
+        if self._letter_index >= 0:
+            self._set_letter_index(-1)
+        elif len(self._query) > 0:
+            self._query = self._query[:-1]
+            self.notify_query()
+            self._update_matches()
+
+    def _set_letter_index(self, index):
+        self._letter_index = index
+        self.notify_candidate_letter()
+        self._update_matches()
+
+    @prev_match_button.pressed
+    def _on_prev_match_button_pressed(self, button):
+        if self._match_index > 0:
+            self._match_index -= 1
+            self._notify_matches()
+
+    @next_match_button.pressed
+    def _on_next_match_button_pressed(self, button):
+        if self._match_index < len(self._matches) - 1:
+            self._match_index += 1
+            self._notify_matches()
+
+    @jump_button.pressed
+    def _on_jump_button_pressed(self, button):
+        if self._match_index < len(self._matches):
+            kind, position = self._matches[self._match_index]
+            item = self._item_for_key(kind, position)
+            if liveobj_valid(item):
+                logger.info(f"Jump to {KIND_PREFIXES[kind]}{item.name}")
+                if kind == KIND_TRACK:
+                    self.song.view.selected_track = item
+                else:
+                    self.song.view.selected_scene = item
+
+    def _update_matches(self):
+        # One extra match is searched only to know whether the list is cut
+        matches = self._index.search(self._query + self.candidate_letter, MAX_MATCHES + 1)
+        self._has_more_matches = len(matches) > MAX_MATCHES
+        self._matches = matches[:MAX_MATCHES]
+        self._match_index = 0
+        self._notify_matches()
+
+    def _notify_matches(self):
+        self.notify_match_count()
+        self.notify_has_more_matches()
+        self.notify_match_name()
+        self.notify_next_match_name()
+
+    @listens("visible_tracks")
+    def _on_visible_tracks_changed(self):
+        self._rebuild_tracks()
+        self._update_matches()
+
+    @listens("scenes")
+    def _on_scenes_changed(self):
+        self._rebuild_scenes()
+        self._update_matches()
+
+    def _rebuild_tracks(self):
+        # Only structure changes rebuild whole list of kind, renaming updates single entry
+        self._tracks = tuple(self.song.visible_tracks)
+        self._rebuild_kind(KIND_TRACK, self._tracks, self._on_track_name_changed)
+
+    def _rebuild_scenes(self):
+        self._scenes = tuple(self.song.scenes)
+        self._rebuild_kind(KIND_SCENE, self._scenes, self._on_scene_name_changed)
+
+    def _rebuild_kind(self, kind, items, listener):
+        for position in range(len(self._positions[kind])):
+            self._index.remove((kind, position))
+        positions = {}
+        for position, item in enumerate(items):
+            positions[item] = position
+            self._index.set_name((kind, position), item.name)
+        self._positions[kind] = positions
+        listener.replace_subjects(items)
+
+    def _update_name(self, kind, item):
+        position = self._positions[kind].get(item)
+        if position != None:
+            self._index.set_name((kind, position), item.name)
+            self._update_matches()
+
+    @listens_group("name")
+    def _on_track_name_changed(self, track):
+        self._update_name(KIND_TRACK, track)
+
+    @listens_group("name")
+    def _on_scene_name_changed(self, scene):
+        self._update_name(KIND_SCENE, scene)
@@ -0,0 +1,16 @@
+# ==================================================
+#
+# This file is part of CustomMaschineMK3.
+# CustomMaschineMK3 is free software licensed under GPL-3.0.
+# For more details, see "LICENSE" file.
+#
+# Copyright (C) 2024-2025 chiaki
+#
+# ==================================================
+
+def step_index_for_button(button, matrix, settings):
+    # Same pad order as step sequencer, Push style counts from top row
+    row, column = button.coordinate
+    if settings != None and settings.get_value("sequencer_style") == "Push":
+        return row * matrix.width + column
+    return (matrix.height - row - 1) * matrix.width + column
@@ -0,0 +1,232 @@
+# ==================================================
+#
+# This file is part of CustomMaschineMK3.
+# CustomMaschineMK3 is free software licensed under GPL-3.0.
+# For more details, see "LICENSE" file.
+#
+# Copyright (C) 2024-2025 chiaki
+#
+# ==================================================
+
+from ableton.v3.control_surface.component import Component
+from ableton.v3.control_surface.display import Renderable
+from ableton.v3.control_surface.controls import (
+    ButtonControl,
+    StepEncoderControl,
+    control_list,
+    control_matrix
+)
+from ableton.v3.base import clamp, depends, listenable_property
+from Live.Clip import MidiNoteSpecification # type: ignore
+
+from .Logger import logger
+from .PadUtils import step_index_for_button
+
+MAX_STEPS = 16
+VARIATION_COUNT = 64
+MAX_RATCHETS = 4
+# Probability of fill notes in percent, hits always play
+DEFAULT_FILL_CHANCE = 50
+FILL_CHANCE_STEP = 5
+
+# All patterns are built from tables below, so changing parameters doesn't need any calculation except bit operations.
+# Each pattern is stored as bit mask, bit N means step N has a note.
+
+def make_euclidean_pattern(steps, hits):
+    # Bresenham style distribution gives same result as Bjorklund's algorithm except rotation
+    mask = 0
+    for step in range(steps):
+        if (step * hits) % steps < hits:
+            mask |= 1 << step
+    return mask
+
+# EUCLIDEAN_PATTERNS[steps][hits]
+EUCLIDEAN_PATTERNS = [[0] * (MAX_STEPS + 1)] + [
+    [make_euclidean_pattern(steps, hits) for hits in range(steps + 1)] + [0] * (MAX_STEPS - steps)
+    for steps in range(1, MAX_STEPS + 1)]
+
+# STEP_MASKS[steps] has bits of all steps in pattern length
+STEP_MASKS = [(1 << steps) - 1 for steps in range(MAX_STEPS + 1)]
+
+def make_random_ranks(seed):
+    # Simple LCG, we need same sequence on every launch for reproducing variations
+    values = []
+    state = seed * 2654435761 + 12345
+    for _ in range(MAX_STEPS):
+        state = (state * 1103515245 + 12345) & 0x7FFFFFFF
+        values.append(state >> 8)
+    return sorted(range(MAX_STEPS), key = lambda step: values[step])
+
+def make_fill_masks(seed):
+    # FILL_MASKS[variation][amount] has amount bits set in random order of the variation
+    ranks = make_random_ranks(seed)
+    masks = [0]
+    for step in ranks:
+        masks.append(masks[-1] | (1 << step))
+    return masks
+
+FILL_MASKS = [make_fill_masks(seed) for seed in range(VARIATION_COUNT)]
+
+def rotate_pattern(mask, steps, rotation):
+    if steps == 0:
+        return 0
+    rotation %= steps
+    step_mask = STEP_MASKS[steps]
+    return ((mask << rotation) | (mask >> (steps - rotation))) & step_mask
+
+STEPS = 0
+HITS = 1
+ROTATION = 2
+FILL = 3
+VARIATION = 4
+RATCHET = 5
+CHANCE = 6
+PARAMETER_COUNT = 8
+
+PARAMETER_NAMES = ["Steps", "Hits", "Rotate", "Fill", "Variation", "Ratchet", "Chance", ""]
+
+# Pads preview the pattern and toggle single steps on top of it, commit button writes it to the clip.
+# Fill steps are written with per-note probability, so each loop plays a different subset of them.
+class PatternGeneratorComponent(Component, Renderable):
+    preview_buttons = control_matrix(ButtonControl, color = None)
+    commit_button = ButtonControl(color = None)
+    parameter_encoders = control_list(StepEncoderControl, control_count = PARAMETER_COUNT, num_steps = 16)
+
+    _pitch_provider = None
+    _step_sequence = None
+    _settings = None
+
+    @depends(settings = None)
+    def __init__(self, name = "Pattern_Generator", settings = None, *a, **k):
+        super().__init__(name, *a, **k)
+        self._settings = settings
+        self._steps = MAX_STEPS
+        self._hits = 4
+        self._rotation = 0
+        self._fill = 0
+        self._variation = 0
+        self._ratchet = 1
+        self._fill_chance = DEFAULT_FILL_CHANCE
+        # Steps toggled by pads, cleared when shape of generated pattern changes
+        self._edit_mask = 0
+        self._hit_mask = 0
+        self._fill_mask = 0
+        self._update_pattern()
+
+    @listenable_property
+    def pattern_description(self):
+        return f"E({self._hits},{self._steps}) R{self._rotation} F{self._fill} C{self._fill_chance} V{self._variation + 1} x{self._ratchet}"
+
+    def set_pitch_provider(self, provider):
+        self._pitch_provider = provider
+
+    def set_step_sequence(self, step_sequence):
+        self._step_sequence = step_sequence
+
+    def set_preview_buttons(self, matrix):
+        self.preview_buttons.set_control_element(matrix)
+        self._update_led_feedback()
+
+    @parameter_encoders.value
+    def _on_parameter_encoder_value(self, value, encoder):
+        index = encoder.index
+        if index == STEPS:
+            self._steps = clamp(self._steps + value, 1, MAX_STEPS)
+            self._hits = min(self._hits, self._steps)
+        elif index == HITS:
+            self._hits = clamp(self._hits + value, 0, self._steps)
+        elif index == ROTATION:
+            self._rotation = (self._rotation + value) % self._steps
+        elif index == FILL:
+            self._fill = clamp(self._fill + value, 0, MAX_STEPS)
+        elif index == VARIATION:
+            self._variation = (self._variation + value) % VARIATION_COUNT
+        elif index == RATCHET:
+            self._ratchet = clamp(self._ratchet + value, 1, MAX_RATCHETS)
+        elif index == CHANCE:
+            self._fill_chance = clamp(self._fill_chance + value * FILL_CHANCE_STEP, FILL_CHANCE_STEP, 100)
+        else:
+            return
+
+        if index not in (RATCHET, CHANCE):
+            self._edit_mask = 0
+        self._update_pattern()
+        self._update_led_feedback()
+        self.notify_pattern_description()
+        self.notify(self.notifications.PatternGenerator.parameter, PARAMETER_NAMES[index], self.pattern_description)
+
+    @preview_buttons.pressed
+    def _on_preview_button_pressed(self, button):
+        step = step_index_for_button(button, self.preview_buttons, self._settings)
+        if step < self._steps:
+            self._edit_mask ^= 1 << step
+            self._update_pattern()
+            self._update_led_feedback()
+
+    @commit_button.pressed
+    def _on_commit_button_pressed(self, button):
+        self._commit_pattern()
+
+    def _update_pattern(self):
+        # Toggled empty step becomes hit, toggled hit or fill step becomes empty
+        step_mask = STEP_MASKS[self._steps]
+        hit_mask = rotate_pattern(EUCLIDEAN_PATTERNS[self._steps][self._hits], self._steps, self._rotation)
+        fill_mask = FILL_MASKS[self._variation][self._fill] & step_mask & ~hit_mask
+        self._hit_mask = (hit_mask ^ self._edit_mask) & step_mask & ~fill_mask
+        self._fill_mask = fill_mask & ~self._edit_mask
+
+    def _update_led_feedback(self):
+        hit_color = "PatternGenerator.Ratchet" if self._ratchet > 1 else "PatternGenerator.Hit"
+        for button in self.preview_buttons:
+            step = step_index_for_button(button, self.preview_buttons, self._settings)
+            bit = 1 << step
+            if self._hit_mask & bit:
+                button.color = hit_color
+            elif self._fill_mask & bit:
+                button.color = "PatternGenerator.Fill"
+            elif step < self._steps:
+                button.color = "PatternGenerator.Step"
+            else:
+                button.color = "PatternGenerator.NoStep"
+
+    def _commit_pattern(self):
+        if self._step_sequence == None or self._pitch_provider == None or len(self._pitch_provider.pitches) == 0:
+            return
+
+        note_editor = self._step_sequence.note_editor
+        step_times = note_editor.visible_step_times()
+        if len(step_times) == 0:
+            return
+
+        pitch = self._pitch_provider.pitches[0]
+        step_length = note_editor.step_length
+        velocity = note_editor.current_velocity
+        ratchet_length = step_length / self._ratchet
+        fill_probability = self._fill_chance / 100.0
+        notes = []
+
+        # Pattern repeats until visible steps are filled
+        for index, start_time in enumerate(step_times):
+            bit = 1 << (index % self._steps)
+            if self._hit_mask & bit:
+                probability = 1.0
+            elif self._fill_mask & bit:
+                probability = fill_probability
+            else:
+                continue
+
+            for ratchet in range(self._ratchet):
+                notes.append(MidiNoteSpecification(
+                    pitch = pitch,
+                    start_time = start_time + ratchet * ratchet_length,
+                    duration = ratchet_length,
+                    velocity = velocity,
+                    mute = False,
+                    probability = probability))
+
+        logger.info(f"Commit pattern {self.pattern_description}, pitch = {pitch}, notes = {len(notes)}")
+        note_editor.replace_notes_in_range(pitch, step_times[0], step_times[-1] + step_length - step_times[0], tuple(notes))
+
+    def update(self):
+        super().update()
+        self._update_led_feedback()
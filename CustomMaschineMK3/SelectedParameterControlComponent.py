@@ -12,6 +12,7 @@ from ableton.v3.control_surface.component import Component
 from ableton.v3.control_surface.display import Renderable
 from ableton.v3.control_surface.controls import (
     ButtonControl,
+    EncoderControl,
     MappedControl,
     control_list
 )
@@ -21,25 +22,43 @@ from ableton.v3.control_surface import (
     ScriptForwarding
 )
 
-from ableton.v3.base import depends
+from ableton.v3.base import clamp, depends, task
 from ableton.v3.live import liveobj_valid
 
 from .Logger import logger
 
+# Fraction of remaining distance applied on each tick
+PRESSURE_SMOOTHING = 0.5
+# Parameter writes smaller than this fraction of parameter range are skipped
+PRESSURE_MIN_DELTA = 0.002
+PAD_COUNT = 16
+
 class SelectedParameterControlComponent(Component, Renderable):
     select_buttons = control_list(ButtonControl, control_count = DEFAULT_BANK_SIZE, color = None)
     select_modifier = ButtonControl(color = None, delay_time = 0.6)
     reset_value_button = ButtonControl(color = None)
     modulation_encoder = MappedControl()
+    # One pressure per pad, strongest held pad drives the modulation
+    pressure_encoders = control_list(EncoderControl, control_count = PAD_COUNT)
 
     _get_knob_mapped_parameter = None
     _show_message = None
+    _settings = None
+    _pressure_parameter = None
+    _pressure_base_value = None
+    _pressure_target = 0.0
+    _pressure_current = 0.0
 
-    @depends(get_knob_mapped_parameter = None, show_message = None)
-    def __init__(self, name = "Selected_Parameter", get_knob_mapped_parameter = None, show_message = None, *a, **k):
+    @depends(get_knob_mapped_parameter = None, show_message = None, settings = None)
+    def __init__(self, name = "Selected_Parameter", get_knob_mapped_parameter = None, show_message = None, settings = None, *a, **k):
         super().__init__(name, *a, **k)
         self._get_knob_mapped_parameter = get_knob_mapped_parameter
         self._show_message = show_message
+        self._settings = settings
+        self._pad_pressures = [0.0] * PAD_COUNT
+        # Pressure values are only stored when received, parameter is written at most once per tick
+        self._pressure_task = self._tasks.add(task.sequence(task.delay(1), task.run(self._apply_pressure)))
+        self._pressure_task.kill()
 
     def set_modulation_encoder(self, encoder):
         self.modulation_encoder.set_control_element(encoder)
@@ -51,7 +70,9 @@ class SelectedParameterControlComponent(Component, Renderable):
         parameter = self._get_knob_mapped_parameter(button.index)
         logger.info(f"Parameter select {parameter.name if liveobj_valid(parameter) else None}")
         self._show_selected_parameter_message(parameter)
+        self._release_pressure()
         self.modulation_encoder.mapped_parameter = parameter
+        self._pressure_parameter = parameter
 
     @select_modifier.pressed_delayed
     def _on_select_modifier_pressed_delayed(self, _):
@@ -69,6 +90,56 @@ class SelectedParameterControlComponent(Component, Renderable):
         if liveobj_valid(parameter) and not parameter.is_quantized:
             parameter.value = parameter.default_value
 
+    @pressure_encoders.value
+    def _on_pressure_encoders_value(self, value, encoder):
+        if self._settings == None or not self._settings.get_value("pressure_modulation"):
+            return
+
+        parameter = self._pressure_parameter
+        if not liveobj_valid(parameter) or parameter.is_quantized:
+            return
+
+        if self._pressure_base_value == None:
+            # Modulation starts from the value at first touch and returns to it on release
+            self._pressure_base_value = parameter.value
+            self._pressure_current = 0.0
+
+        # Releasing one pad doesn't reset modulation while other pads are held
+        self._pad_pressures[encoder.index] = clamp(value, 0.0, 1.0)
+        self._pressure_target = max(self._pad_pressures)
+        if not self._pressure_task.is_running:
+            self._pressure_task.restart()
+
+    def _apply_pressure(self):
+        parameter = self._pressure_parameter
+        if not liveobj_valid(parameter) or self._pressure_base_value == None:
+            self._pressure_base_value = None
+            return
+
+        distance = self._pressure_target - self._pressure_current
+        self._pressure_current = self._pressure_target if abs(distance) < PRESSURE_MIN_DELTA else self._pressure_current + distance * PRESSURE_SMOOTHING
+
+        value_range = parameter.max - parameter.min
+        base_value = self._pressure_base_value
+        new_value = clamp(base_value + (parameter.max - base_value) * self._pressure_current, parameter.min, parameter.max)
+        if abs(new_value - parameter.value) >= value_range * PRESSURE_MIN_DELTA:
+            parameter.value = new_value
+
+        if self._pressure_current != self._pressure_target:
+            self._pressure_task.restart()
+        elif self._pressure_target == 0.0:
+            self._release_pressure()
+
+    def _release_pressure(self):
+        parameter = self._pressure_parameter
+        if self._pressure_base_value != None and liveobj_valid(parameter):
+            parameter.value = self._pressure_base_value
+        self._pressure_task.kill()
+        self._pressure_base_value = None
+        self._pressure_target = 0.0
+        self._pressure_current = 0.0
+        self._pad_pressures = [0.0] * PAD_COUNT
+
     def _show_selected_parameter_message(self, parameter):
         if liveobj_valid(parameter):
             self.notify(self.notifications.SelectedParameterControl.select, *self._get_parameter_path(parameter))
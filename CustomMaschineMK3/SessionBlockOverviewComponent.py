@@ -0,0 +1,337 @@
+# ==================================================
+#
+# This file is part of CustomMaschineMK3.
+# CustomMaschineMK3 is free software licensed under GPL-3.0.
+# For more details, see "LICENSE" file.
+#
+# Copyright (C) 2024-2025 chiaki
+#
+# ==================================================
+
+from math import ceil
+from ableton.v3.control_surface.component import Component
+from ableton.v3.control_surface.controls import ButtonControl, control_matrix
+from ableton.v3.base import depends, listens, listens_group
+
+from .Logger import logger
+
+BLOCK_COLUMNS = 4
+BLOCK_ROWS = 4
+
+SLOT_HAS_CLIP = 1
+SLOT_PLAYING = 2
+SLOT_RECORDING = 4
+
+STATE_FLAGS = (SLOT_HAS_CLIP, SLOT_PLAYING, SLOT_RECORDING)
+
+def _add_counts(counts, state, sign):
+    for index, flag in enumerate(STATE_FLAGS):
+        if state & flag:
+            counts[index] += sign
+
+# Clip, playing and recording counts of each block.
+# Counts are changed by state differences of single slots, whole set is never scanned for state changes.
+# Each track also keeps its counts per block row, so a track moved to another block column
+# moves only these row counts instead of recounting its slots.
+class BlockAggregates:
+    def __init__(self):
+        self.block_width = 1
+        self.block_height = 1
+        self.clear()
+
+    def clear(self):
+        self._track_indices = {}
+        self._track_states = {}
+        self._track_rows = {}
+        self._counts = [[0] * len(STATE_FLAGS) for _ in range(BLOCK_COLUMNS * BLOCK_ROWS)]
+
+    def set_block_size(self, block_width, block_height):
+        # Returns True if block size is changed
+        # Counts are rebuilt from kept slot states, Live objects aren't read here
+        if block_width == self.block_width and block_height == self.block_height:
+            return False
+
+        tracks = [(key, self._track_indices[key], states) for key, states in self._track_states.items()]
+        self.block_width = block_width
+        self.block_height = block_height
+        self.clear()
+        for key, track_index, states in tracks:
+            self.set_track(key, track_index, states)
+        return True
+
+    def _block(self, column, row):
+        if column < BLOCK_COLUMNS and row < BLOCK_ROWS:
+            return row * BLOCK_COLUMNS + column
+        return -1
+
+    def _column(self, track_index):
+        return track_index // self.block_width
+
+    def _apply_rows(self, column, rows, sign):
+        for row, row_counts in enumerate(rows):
+            block = self._block(column, row)
+            if block != -1:
+                for index, count in enumerate(row_counts):
+                    self._counts[block][index] += count * sign
+
+    def track_states(self, track_key):
+        return self._track_states.get(track_key, {})
+
+    def set_track(self, track_key, track_index, states):
+        # states: {scene_index: state} of slots in track, slots without clip can be omitted
+        self.remove_track(track_key)
+        rows = [[0] * len(STATE_FLAGS) for _ in range(BLOCK_ROWS)]
+        kept_states = {}
+        for scene_index, state in states.items():
+            if state != 0:
+                kept_states[scene_index] = state
+                row = scene_index // self.block_height
+                if row < BLOCK_ROWS:
+                    _add_counts(rows[row], state, 1)
+
+        self._track_indices[track_key] = track_index
+        self._track_states[track_key] = kept_states
+        self._track_rows[track_key] = rows
+        self._apply_rows(self._column(track_index), rows, 1)
+
+    def move_track(self, track_key, track_index):
+        # Returns True if the track is moved to another block column
+        old_index = self._track_indices.get(track_key)
+        if old_index == None or old_index == track_index:
+            return False
+
+        self._track_indices[track_key] = track_index
+        old_column = self._column(old_index)
+        column = self._column(track_index)
+        if column == old_column:
+            return False
+
+        rows = self._track_rows[track_key]
+        self._apply_rows(old_column, rows, -1)
+        self._apply_rows(column, rows, 1)
+        return True
+
+    def remove_track(self, track_key):
+        track_index = self._track_indices.pop(track_key, None)
+        if track_index != None:
+            self._apply_rows(self._column(track_index), self._track_rows.pop(track_key), -1)
+            del self._track_states[track_key]
+
+    def update_slot(self, track_key, scene_index, state):
+        # Returns changed block index, or -1 if block state is unchanged
+        states = self._track_states.get(track_key)
+        if states == None:
+            return -1
+        old_state = states.get(scene_index, 0)
+        if old_state == state:
+            return -1
+
+        if state == 0:
+            del states[scene_index]
+        else:
+            states[scene_index] = state
+
+        row = scene_index // self.block_height
+        if row >= BLOCK_ROWS:
+            return -1
+        row_counts = self._track_rows[track_key][row]
+        _add_counts(row_counts, old_state, -1)
+        _add_counts(row_counts, state, 1)
+        block = self._block(self._column(self._track_indices[track_key]), row)
+        if block != -1:
+            _add_counts(self._counts[block], old_state, -1)
+            _add_counts(self._counts[block], state, 1)
+        return block
+
+    def block_color(self, block):
+        clip_count, playing_count, recording_count = self._counts[block]
+        if recording_count > 0:
+            return "BlockOverview.Recording"
+        elif playing_count > 0:
+            return "BlockOverview.Playing"
+        elif clip_count > 0:
+            return "BlockOverview.HasClips"
+        return "BlockOverview.Empty"
+
+def slot_state(clip_slot):
+    state = 0
+    if clip_slot.has_clip:
+        state |= SLOT_HAS_CLIP
+        if clip_slot.is_recording:
+            state |= SLOT_RECORDING
+        elif clip_slot.is_playing:
+            state |= SLOT_PLAYING
+    return state
+
+# Slot listeners and counts are kept while the overview is hidden, so showing it only repaints buttons.
+# Track list changes add or remove listeners of added or removed tracks only,
+# and scene changes do the same for added or removed slots of each track.
+class SessionBlockOverviewComponent(Component):
+    block_buttons = control_matrix(ButtonControl, color = None)
+
+    _session_ring = None
+    _track_count = 0
+    _scene_count = 0
+
+    @depends(session_ring = None)
+    def __init__(self, name = "Session_Block_Overview", session_ring = None, *a, **k):
+        super().__init__(name, *a, **k)
+        self._session_ring = session_ring
+        self._aggregates = BlockAggregates()
+        # Clip slots of each track, Live objects are used as keys
+        self._track_slots = {}
+        # (track, scene index) of each clip slot
+        self._slot_positions = {}
+        self._on_visible_tracks_changed.subject = self.song
+        self._on_scenes_changed.subject = self.song
+        self._on_ring_offset_changed.subject = self._session_ring
+        self._scene_count = len(self.song.scenes)
+        self._sync_tracks()
+
+    def set_block_buttons(self, matrix):
+        self.block_buttons.set_control_element(matrix)
+        self._update_led_feedback()
+
+    @block_buttons.pressed
+    def _on_block_button_pressed(self, button):
+        row, column = button.coordinate
+        track_offset = column * self._aggregates.block_width
+        scene_offset = row * self._aggregates.block_height
+        if track_offset < self._track_count and scene_offset < self._scene_count:
+            logger.info(f"Jump session ring to track {track_offset}, scene {scene_offset}")
+            self._session_ring.set_offsets(track_offset, scene_offset)
+
+    @listens("visible_tracks")
+    def _on_visible_tracks_changed(self):
+        self._sync_tracks()
+        self._update_led_feedback()
+
+    @listens("scenes")
+    def _on_scenes_changed(self):
+        self._sync_scenes()
+        self._update_led_feedback()
+
+    @listens("offset")
+    def _on_ring_offset_changed(self, *_):
+        self._update_led_feedback()
+
+    @listens_group("has_clip")
+    def _on_has_clip_changed(self, clip_slot):
+        self._update_slot(clip_slot)
+
+    @listens_group("playing_status")
+    def _on_playing_status_changed(self, clip_slot):
+        self._update_slot(clip_slot)
+
+    @listens_group("is_triggered")
+    def _on_is_triggered_changed(self, clip_slot):
+        # Recording state change comes with trigger state change
+        self._update_slot(clip_slot)
+
+    def _slot_listeners(self):
+        return (self._on_has_clip_changed, self._on_playing_status_changed, self._on_is_triggered_changed)
+
+    def _update_slot(self, clip_slot):
+        position = self._slot_positions.get(clip_slot)
+        if position != None:
+            block = self._aggregates.update_slot(*position, slot_state(clip_slot))
+            if block != -1:
+                self._update_block_button(block)
+
+    def _add_slots(self, track, clip_slots, states, first_scene_index = 0):
+        for scene_index, clip_slot in enumerate(clip_slots, first_scene_index):
+            self._slot_positions[clip_slot] = (track, scene_index)
+            for listener in self._slot_listeners():
+                listener.add_subject(clip_slot)
+            states[scene_index] = slot_state(clip_slot)
+
+    def _remove_slots(self, clip_slots):
+        for clip_slot in clip_slots:
+            self._slot_positions.pop(clip_slot, None)
+            for listener in self._slot_listeners():
+                listener.remove_subject(clip_slot)
+
+    def _sync_tracks(self):
+        # Clip slots are read only for added tracks, other tracks just move their counts
+        tracks = self.song.visible_tracks
+        self._track_count = len(tracks)
+        self._update_block_size()
+
+        visible_tracks = set()
+        for track_index, track in enumerate(tracks):
+            visible_tracks.add(track)
+            if track in self._track_slots:
+                self._aggregates.move_track(track, track_index)
+            else:
+                clip_slots = tuple(track.clip_slots)
+                states = {}
+                self._add_slots(track, clip_slots, states)
+                self._track_slots[track] = clip_slots
+                self._aggregates.set_track(track, track_index, states)
+
+        for track in [track for track in self._track_slots if track not in visible_tracks]:
+            self._remove_slots(self._track_slots.pop(track))
+            self._aggregates.remove_track(track)
+        logger.info(f"Session block overview tracks = {self._track_count}, scenes = {self._scene_count}")
+
+    def _sync_scenes(self):
+        # Slots kept in tracks reuse their listeners and states, only added slots are read
+        self._scene_count = len(self.song.scenes)
+        self._update_block_size()
+        for track_index, track in enumerate(self.song.visible_tracks):
+            old_slots = self._track_slots.get(track)
+            if old_slots == None:
+                continue
+
+            old_states = self._aggregates.track_states(track)
+            old_indices = {clip_slot: scene_index for scene_index, clip_slot in enumerate(old_slots)}
+            clip_slots = tuple(track.clip_slots)
+            states = {}
+            for scene_index, clip_slot in enumerate(clip_slots):
+                old_index = old_indices.pop(clip_slot, None)
+                if old_index != None:
+                    self._slot_positions[clip_slot] = (track, scene_index)
+                    states[scene_index] = old_states.get(old_index, 0)
+                else:
+                    self._add_slots(track, (clip_slot,), states, scene_index)
+
+            self._remove_slots(list(old_indices.keys()))
+            self._track_slots[track] = clip_slots
+            self._aggregates.set_track(track, track_index, states)
+
+    def _update_block_size(self):
+        # Blocks are multiple of session ring size, so ring jumps line up with pages
+        ring_width = self._session_ring.num_tracks
+        ring_height = self._session_ring.num_scenes
+        block_width = max(1, ceil(self._track_count / (BLOCK_COLUMNS * ring_width))) * ring_width
+        block_height = max(1, ceil(self._scene_count / (BLOCK_ROWS * ring_height))) * ring_height
+        if self._aggregates.set_block_size(block_width, block_height):
+            logger.info(f"Session block size = {block_width}x{block_height}")
+
+    def _block_color(self, block):
+        row, column = divmod(block, BLOCK_COLUMNS)
+        track_offset = column * self._aggregates.block_width
+        scene_offset = row * self._aggregates.block_height
+        if track_offset >= self._track_count or scene_offset >= self._scene_count:
+            return "BlockOverview.NoBlock"
+
+        ring = self._session_ring
+        if track_offset <= ring.track_offset < track_offset + self._aggregates.block_width and \
+            scene_offset <= ring.scene_offset < scene_offset + self._aggregates.block_height:
+            return "BlockOverview.Selected"
+        return self._aggregates.block_color(block)
+
+    def _update_block_button(self, block):
+        for button in self.block_buttons:
+            row, column = button.coordinate
+            if row * BLOCK_COLUMNS + column == block:
+                button.color = self._block_color(block)
+
+    def _update_led_feedback(self):
+        for button in self.block_buttons:
+            row, column = button.coordinate
+            button.color = self._block_color(row * BLOCK_COLUMNS + column)
+
+    def update(self):
+        super().update()
+        self._update_led_feedback()
@@ -157,6 +157,40 @@ SETTINGS = [
         "default_value": "Maschine",
         "enum": ["Maschine", "Push"]
     },
+    {
+        "key": "led_color_mapping",
+        "description": "LED Color Mapping (Reload required)",
+        "type": "enum",
+        "default_value": "Index",
+        "enum": ["Index", "RGB"]
+    },
+    {
+        "key": "transient_snap",
+        "description": "Snap Audio Clip Edits To Transients",
+        "type": "bool",
+        "default_value": False,
+    },
+    {
+        "key": "pressure_modulation",
+        "description": "Pad Pressure To Selected Parameter",
+        "type": "bool",
+        "default_value": False,
+    },
+    {
+        "key": "clip_animation",
+        "description": "Playing Clip Animation",
+        "type": "enum",
+        "default_value": "Blink",
+        "enum": ["Blink", "Pulse", "Fade"],
+    },
+    {
+        "key": "clip_animation_period",
+        "description": "Clip Animation Period (x100ms)",
+        "type": "int",
+        "default_value": 10,
+        "min": 2,
+        "max": 40,
+    },
     {
         "key": "__version",
         "description": "CustomMaschineMK3 by chiaki",
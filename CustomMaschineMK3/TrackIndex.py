@@ -0,0 +1,145 @@
+# ==================================================
+#
+# This file is part of CustomMaschineMK3.
+# CustomMaschineMK3 is free software licensed under GPL-3.0.
+# For more details, see "LICENSE" file.
+#
+# Copyright (C) 2024-2025 chiaki
+#
+# ==================================================
+
+from ableton.v3.base import EventObject, listens, listens_group
+from ableton.v3.live import liveobj_valid
+
+from .Logger import logger
+
+# Position lookup of tracks shared between components.
+# Tracks themselves are used as keys, Live objects compare and hash by the object they wrap.
+# Track lists and position maps are rebuilt lazily after the song's track lists change,
+# so selecting or creating tracks doesn't scan the whole set every time.
+# Soloed, muted and armed tracks are also kept here from track listeners,
+# bulk operations like "clear all solo" touch only tracks in these sets.
+# "track_states" event is sent when any of these sets is changed.
+class TrackIndex(EventObject):
+    __events__ = ("track_states",)
+
+    def __init__(self, song = None, *a, **k):
+        super().__init__(*a, **k)
+        self._song = song
+        self._is_valid = False
+        self._visible_tracks = ()
+        self._return_and_master_tracks = ()
+        self._visible_positions = {}
+        self._return_positions = {}
+        self._soloed_tracks = {}
+        self._muted_tracks = {}
+        self._armed_tracks = {}
+        self._on_visible_tracks_changed.subject = song
+        self._on_tracks_changed.subject = song
+        self._on_return_tracks_changed.subject = song
+        self._update_state_subjects()
+
+    @property
+    def visible_tracks(self):
+        self._validate()
+        return self._visible_tracks
+
+    @property
+    def return_and_master_tracks(self):
+        self._validate()
+        return self._return_and_master_tracks
+
+    def track_info(self, track):
+        # (True, index in visible tracks) for midi or audio track,
+        # (False, index in return tracks) for return track and (False, -1) for master track
+        if not liveobj_valid(track):
+            return (False, -1)
+
+        self._validate()
+        index = self._visible_positions.get(track)
+        if index != None:
+            return (True, index)
+        return (False, self._return_positions.get(track, -1))
+
+    def soloed_tracks(self):
+        return list(self._soloed_tracks.values())
+
+    def muted_tracks(self):
+        return list(self._muted_tracks.values())
+
+    def armed_tracks(self):
+        return list(self._armed_tracks.values())
+
+    @property
+    def solo_count(self):
+        return len(self._soloed_tracks)
+
+    @property
+    def mute_count(self):
+        return len(self._muted_tracks)
+
+    @property
+    def arm_count(self):
+        return len(self._armed_tracks)
+
+    def invalidate(self):
+        self._is_valid = False
+
+    def _validate(self):
+        if self._is_valid:
+            return
+
+        song = self._song
+        self._visible_tracks = tuple(song.visible_tracks)
+        self._return_and_master_tracks = tuple(song.return_tracks) + (song.master_track,)
+        self._visible_positions = {track: index for index, track in enumerate(self._visible_tracks)}
+        self._return_positions = {track: index for index, track in enumerate(song.return_tracks)}
+        self._is_valid = True
+        logger.debug(f"Track index rebuilt, visible tracks = {len(self._visible_tracks)}, return tracks = {len(self._return_positions)}")
+
+    @listens("visible_tracks")
+    def _on_visible_tracks_changed(self):
+        self.invalidate()
+
+    @listens("tracks")
+    def _on_tracks_changed(self):
+        self.invalidate()
+        self._update_state_subjects()
+
+    @listens("return_tracks")
+    def _on_return_tracks_changed(self):
+        self.invalidate()
+        self._update_state_subjects()
+
+    def _update_state_subjects(self):
+        # Master track has no solo and mute, tracks like group track can't be armed
+        tracks = list(self._song.tracks)
+        mixable_tracks = tracks + list(self._song.return_tracks)
+        armable_tracks = [track for track in tracks if track.can_be_armed]
+        self._on_solo_changed.replace_subjects(mixable_tracks)
+        self._on_mute_changed.replace_subjects(mixable_tracks)
+        self._on_arm_changed.replace_subjects(armable_tracks)
+
+        self._soloed_tracks = {track: track for track in mixable_tracks if track.solo}
+        self._muted_tracks = {track: track for track in mixable_tracks if track.mute}
+        self._armed_tracks = {track: track for track in armable_tracks if track.arm}
+        self.notify_track_states()
+
+    def _update_track_state(self, track, is_on, tracks):
+        if is_on:
+            tracks[track] = track
+        else:
+            tracks.pop(track, None)
+        self.notify_track_states()
+
+    @listens_group("solo")
+    def _on_solo_changed(self, track):
+        self._update_track_state(track, track.solo, self._soloed_tracks)
+
+    @listens_group("mute")
+    def _on_mute_changed(self, track):
+        self._update_track_state(track, track.mute, self._muted_tracks)
+
+    @listens_group("arm")
+    def _on_arm_changed(self, track):
+        self._update_track_state(track, track.arm, self._armed_tracks)
@@ -0,0 +1,208 @@
+# ==================================================
+#
+# This file is part of CustomMaschineMK3.
+# CustomMaschineMK3 is free software licensed under GPL-3.0.
+# For more details, see "LICENSE" file.
+#
+# Copyright (C) 2024-2025 chiaki
+#
+# ==================================================
+
+import mmap
+import sys
+import threading
+import wave
+from array import array
+from collections import deque
+from math import log10
+from pathlib import Path
+
+from .Logger import logger
+
+HOP_SIZE = 512
+HOPS_PER_READ = 256
+# Only every Nth sample of first channel is used for envelope, it's enough for finding attacks
+DECIMATION = 4
+THRESHOLD_WINDOW = 8
+THRESHOLD_OFFSET = 0.2
+MIN_ONSET_INTERVAL = 0.05
+MAX_CACHED_FILES = 32
+SILENCE_FLOOR = 1e-10
+
+def _to_16bit_samples(data, sample_width):
+    if sample_width == 1:
+        # 8bit wave is unsigned
+        samples = array("h", (value - 128 << 8 for value in data))
+        return samples
+    elif sample_width == 2:
+        samples = array("h")
+        samples.frombytes(data)
+    elif sample_width == 3:
+        # Drop lowest byte, remaining 2 bytes form 16bit sample
+        packed = bytearray(len(data) // 3 * 2)
+        packed[0::2] = data[1::3]
+        packed[1::2] = data[2::3]
+        samples = array("h")
+        samples.frombytes(packed)
+    elif sample_width == 4:
+        packed = bytearray(len(data) // 2)
+        packed[0::2] = data[2::4]
+        packed[1::2] = data[3::4]
+        samples = array("h")
+        samples.frombytes(packed)
+    else:
+        return None
+
+    if sys.byteorder == "big":
+        samples.byteswap()
+    return samples
+
+def read_log_energy_envelope(file_path):
+    # Returns (log energy of each hop, hop duration in seconds)
+    envelope = []
+    with open(file_path, "rb") as file, mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_READ) as data:
+        with wave.open(data) as reader:
+            channels = reader.getnchannels()
+            sample_width = reader.getsampwidth()
+            frame_rate = reader.getframerate()
+            stride = channels * DECIMATION
+            hop_samples = HOP_SIZE // DECIMATION
+            scale = 1.0 / (32768.0 * 32768.0 * hop_samples)
+
+            while True:
+                frames = reader.readframes(HOP_SIZE * HOPS_PER_READ)
+                if len(frames) == 0:
+                    break
+
+                samples = _to_16bit_samples(frames, sample_width)
+                if samples == None:
+                    logger.warning(f"Unsupported sample width {sample_width} in {file_path}")
+                    return [], 0.0
+
+                samples = samples[0::stride]
+                for start in range(0, len(samples), hop_samples):
+                    energy = sum(value * value for value in samples[start:start + hop_samples]) * scale
+                    envelope.append(log10(energy + SILENCE_FLOOR))
+
+    return envelope, HOP_SIZE / frame_rate
+
+def detect_onsets(envelope, hop_duration):
+    # Energy flux with adaptive threshold, pure Python replacement of spectral flux
+    count = len(envelope)
+    if count < 3:
+        return ()
+
+    flux = [0.0] + [max(0.0, envelope[index] - envelope[index - 1]) for index in range(1, count)]
+    onsets = []
+    last_onset = -MIN_ONSET_INTERVAL
+    window_sum = sum(flux[:THRESHOLD_WINDOW + 1])
+    window_start = 0
+    window_end = THRESHOLD_WINDOW + 1
+
+    for index in range(1, count - 1):
+        # Keep sliding window sum of [index - WINDOW, index + WINDOW]
+        new_start = max(0, index - THRESHOLD_WINDOW)
+        new_end = min(count, index + THRESHOLD_WINDOW + 1)
+        while window_start < new_start:
+            window_sum -= flux[window_start]
+            window_start += 1
+        while window_end < new_end:
+            window_sum += flux[window_end]
+            window_end += 1
+
+        value = flux[index]
+        threshold = window_sum / (window_end - window_start) + THRESHOLD_OFFSET
+        if value > threshold and value >= flux[index - 1] and value >= flux[index + 1]:
+            time = index * hop_duration
+            if time - last_onset >= MIN_ONSET_INTERVAL:
+                onsets.append(time)
+                last_onset = time
+
+    return tuple(onsets)
+
+class TransientAnalyzer:
+    # Analysis runs in worker thread, script thread only reads finished results.
+    # Worker never touches Live API, so it's safe to run outside of main thread.
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._requests = deque()
+        self._pending = set()
+        self._onsets = {}
+        # Key of each file path, file is checked again only after invalidate()
+        self._keys = {}
+        self._thread = None
+        self._stopped = False
+
+    def onsets_for(self, file_path):
+        # Returns sorted onset times in seconds, or None while analysis isn't finished
+        key = self._make_key(file_path)
+        if key == None:
+            return None
+
+        with self._condition:
+            onsets = self._onsets.get(key)
+            if onsets == None and key not in self._pending and not self._stopped:
+                self._pending.add(key)
+                self._requests.append(key)
+                self._ensure_worker()
+                self._condition.notify()
+            return onsets
+
+    def invalidate(self, file_path):
+        # Called when clip's file is replaced, next request reads modification time again
+        self._keys.pop(file_path, None)
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._requests.clear()
+            self._condition.notify()
+
+    def _make_key(self, file_path):
+        if not file_path:
+            return None
+
+        key = self._keys.get(file_path)
+        if key == None:
+            try:
+                # Include modification time so re-rendered file is analyzed again
+                key = (file_path, Path(file_path).stat().st_mtime)
+            except OSError:
+                return None
+            self._keys[file_path] = key
+            while len(self._keys) > MAX_CACHED_FILES:
+                del self._keys[next(iter(self._keys))]
+        return key
+
+    def _ensure_worker(self):
+        if self._thread == None or not self._thread.is_alive():
+            self._thread = threading.Thread(target = self._run, name = "TransientAnalyzer", daemon = True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while len(self._requests) == 0 and not self._stopped:
+                    self._condition.wait()
+                if self._stopped:
+                    return
+                key = self._requests.popleft()
+
+            onsets = self._analyze(key[0])
+
+            with self._condition:
+                self._pending.discard(key)
+                self._onsets[key] = onsets
+                while len(self._onsets) > MAX_CACHED_FILES:
+                    del self._onsets[next(iter(self._onsets))]
+
+    def _analyze(self, file_path):
+        try:
+            envelope, hop_duration = read_log_energy_envelope(file_path)
+            onsets = detect_onsets(envelope, hop_duration)
+            logger.info(f"Found {len(onsets)} transients in {file_path}")
+            return onsets
+        except (wave.Error, EOFError, OSError, ValueError) as ex:
+            # Unsupported format, cache empty result to avoid analyzing again
+            logger.info(f"Transient analysis skipped for {file_path}: {ex}")
+            return ()
@@ -26,10 +26,10 @@ from ableton.v3.control_surface.controls import (
     PlayableControl,
     control_matrix
 )
-from ableton.v3.control_surface.skin import LiveObjSkinEntry
 from ableton.v3.base import depends, listens
 
 from .Logger import logger
+from .LedColorCacheMixin import LedColorCacheMixin
 
 DEFAULT_NOTE = 60
 # Simulate Live's internal velocity calculation
@@ -37,7 +37,7 @@ DEFAULT_NOTE = 60
 VELOCITY_LEVELS = list(range(127, 0, -8))[::-1]
 DEFAULT_LEVEL_INDEX = 12
 
-class VelocityLevelsComponent(PlayableComponent, Renderable):
+class VelocityLevelsComponent(PlayableComponent, LedColorCacheMixin, Renderable):
     _pitch_provider = None
     _target_track = None
     _velocity_levels = None
@@ -107,8 +107,8 @@ class VelocityLevelsComponent(PlayableComponent, Renderable):
         else:
             color_name = f"VelocityLevels.Level{level}"
 
-        button.color = LiveObjSkinEntry(color_name, self._target_track.target_track)
-        button.pressed_color = LiveObjSkinEntry("VelocityLevels.Pressed", self._target_track.target_track)
+        self._validate_led_cache(self._target_track.target_track)
+        self._set_led_color(button, color_name, "VelocityLevels.Pressed")
 
     def _update_velocity_levels_state(self):
         self._velocity_levels.enabled = self._enabled
@@ -133,7 +133,8 @@ class VelocityLevelsComponent(PlayableComponent, Renderable):
         self._on_track_color_changed.subject = self._target_track.target_track
         self._update_led_feedback()
 
-    @listens("color_index")
+    # "color" changes with color index too, so it covers both LED color mappings
+    @listens("color")
     def _on_track_color_changed(self):
         self._update_led_feedback()
 